@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from colors.models import ColorGroup
+        from features.models import Feature
+        from products.dimensions import dimension_cache
+
+        for model in (ColorGroup, Feature):
+            post_save.connect(
+                dimension_cache.invalidate, sender=model, dispatch_uid=f'dimension_cache_{model.__name__}_save'
+            )
+            post_delete.connect(
+                dimension_cache.invalidate, sender=model, dispatch_uid=f'dimension_cache_{model.__name__}_delete'
+            )
+        m2m_changed.connect(
+            dimension_cache.invalidate, sender=ColorGroup.colors.through, dispatch_uid='dimension_cache_colors_m2m'
+        )
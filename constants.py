@@ -0,0 +1,38 @@
+from django.conf import settings
+
+OFFER_COUNT_BATCH_SIZE = getattr(settings, 'PRODUCTS_OFFER_COUNT_BATCH_SIZE', 500)
+OFFER_COUNT_BATCH_WINDOW_MS = getattr(settings, 'PRODUCTS_OFFER_COUNT_BATCH_WINDOW_MS', 500)
+CONSUMER_DB_CONCURRENCY = getattr(settings, 'PRODUCTS_CONSUMER_DB_CONCURRENCY', 4)
+CONSUMER_FAUST_APP = getattr(settings, 'PRODUCTS_CONSUMER_FAUST_APP', None)
+CONSUMER_WORKER_ENV = 'PRODUCTS_CONSUMER_WORKER'
+CONSUMER_DATA_DIR = getattr(settings, 'PRODUCTS_CONSUMER_DATA_DIR', 'faust-data')
+
+PRODUCT_BRAND_BULK_UPDATE_TOPIC = getattr(settings, 'PRODUCTS_BRAND_BULK_UPDATE_TOPIC', 'product_brand_bulk_update')
+
+PRODUCT_EVENTS_RELAY_BATCH_SIZE = getattr(settings, 'PRODUCTS_EVENTS_RELAY_BATCH_SIZE', 500)
+PRODUCT_EVENTS_RELAY_INTERVAL = getattr(settings, 'PRODUCTS_EVENTS_RELAY_INTERVAL', 1.0)
+PRODUCT_EVENTS_ENCODING = getattr(settings, 'PRODUCTS_EVENTS_ENCODING', 'json')
+PRODUCT_UPDATE_EVENTS_CHANGED_ONLY = getattr(settings, 'PRODUCTS_UPDATE_EVENTS_CHANGED_ONLY', False)
+
+PRODUCT_SEARCH_MAX_RESULT_WINDOW = getattr(settings, 'PRODUCTS_SEARCH_MAX_RESULT_WINDOW', 10000)
+PRODUCT_INDEX_CHUNK_SIZE = getattr(settings, 'PRODUCTS_INDEX_CHUNK_SIZE', 500)
+PRODUCT_INDEX_QUEUE_WINDOW_MS = getattr(settings, 'PRODUCTS_INDEX_QUEUE_WINDOW_MS', 500)
+DIMENSION_CACHE_TTL = getattr(settings, 'PRODUCTS_DIMENSION_CACHE_TTL', 300)
+PRODUCT_INDEX_SYNC_STATE_NAME = 'products_index'
+PRODUCT_INDEX_SYNC_OVERLAP_SECONDS = getattr(settings, 'PRODUCTS_INDEX_SYNC_OVERLAP_SECONDS', 60)
+
+METRICS_TEXTFILE = getattr(settings, 'PRODUCTS_METRICS_TEXTFILE', None)
+METRICS_TEXTFILE_INTERVAL = getattr(settings, 'PRODUCTS_METRICS_TEXTFILE_INTERVAL', 15)
+
+CONSUMER_MESSAGES_CONSUMED_METRIC = 'products_consumer_messages_consumed_total'
+CONSUMER_MESSAGES_SKIPPED_METRIC = 'products_consumer_messages_skipped_total'
+CONSUMER_MESSAGES_FAILED_METRIC = 'products_consumer_messages_failed_total'
+CONSUMER_MISSING_PRODUCTS_METRIC = 'products_consumer_missing_products_total'
+CONSUMER_DB_WRITE_SECONDS_METRIC = 'products_consumer_db_write_seconds'
+CONSUMER_BATCH_SIZE_METRIC = 'products_consumer_batch_size'
+CONSUMER_LAG_METRIC = 'products_consumer_lag'
+CONSUMER_BATCH_SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+PRODUCER_EVENTS_DELIVERED_METRIC = 'products_producer_events_delivered_total'
+PRODUCER_EVENTS_FAILED_METRIC = 'products_producer_events_failed_total'
+PRODUCER_PUBLISH_SECONDS_METRIC = 'products_producer_publish_seconds'
@@ -1,8 +1,14 @@
+import asyncio
+import functools
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_UP
+from decimal import Decimal
+from typing import Optional
 
 import django
-from asgiref.sync import sync_to_async
 from django.db import IntegrityError
 
 from common.constants import OFFER_PRICE_COUNT_UPDATE_TOPIC
@@ -12,38 +18,257 @@ from products.consumers.schemas import ProductReviewCountRatingSchema
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings.base')
 django.setup()
 
+from django.db import close_old_connections
+from django.db import connections
+from django.db import transaction
+
+from products import metrics
+from products.constants import CONSUMER_BATCH_SIZE_BUCKETS
+from products.constants import CONSUMER_BATCH_SIZE_METRIC
+from products.constants import CONSUMER_DB_CONCURRENCY
+from products.constants import CONSUMER_DB_WRITE_SECONDS_METRIC
+from products.constants import CONSUMER_LAG_METRIC
+from products.constants import CONSUMER_MESSAGES_CONSUMED_METRIC
+from products.constants import CONSUMER_MESSAGES_FAILED_METRIC
+from products.constants import CONSUMER_MESSAGES_SKIPPED_METRIC
+from products.constants import CONSUMER_MISSING_PRODUCTS_METRIC
+from products.constants import CONSUMER_WORKER_ENV
+from products.constants import METRICS_TEXTFILE
+from products.constants import METRICS_TEXTFILE_INTERVAL
+from products.constants import OFFER_COUNT_BATCH_SIZE
+from products.constants import OFFER_COUNT_BATCH_WINDOW_MS
 from products.consumers.schemas import OfferCountPriceSchema
+from products.documents import ProductDocument
 from products.models import Product
 
+_consumed_offsets = {}
+_consumer_metrics_task = None
+_db_executor = ThreadPoolExecutor(max_workers=CONSUMER_DB_CONCURRENCY, thread_name_prefix='products-consumer-db')
+
+
+def _call_with_connection(func, *args, **kwargs):
+    # pool threads keep their connection open between messages, like the single consumer thread did,
+    # and only drop it after a failure left it unusable
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        close_old_connections()
+        raise
+
+
+def close_database_connections():
+    # every pool thread keeps its own connection, so block one task per thread on a barrier
+    # until all of them have closed theirs
+    barrier = threading.Barrier(CONSUMER_DB_CONCURRENCY)
+
+    def close_thread_connections():
+        connections.close_all()
+        barrier.wait()
+
+    futures = [_db_executor.submit(close_thread_connections) for _ in range(CONSUMER_DB_CONCURRENCY)]
+    for future in futures:
+        future.result()
+
+
+def database_sync_to_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _db_executor, functools.partial(_call_with_connection, func, *args, **kwargs)
+        )
+
+    return wrapper
 
-@sync_to_async
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
+
+
+def _offer_is_unchanged(offers_count: int, offers_min_price, offers_old_price, data: OfferCountPriceSchema) -> bool:
+    return (
+        offers_count == data.count
+        and offers_min_price == _to_decimal(data.price)
+        and offers_old_price == _to_decimal(data.old_price)
+    )
+
+
+def _offer_counters(data: OfferCountPriceSchema) -> dict:
+    return dict(
+        offers_count=data.count,
+        offers_min_price=_to_decimal(data.price),
+        offers_old_price=_to_decimal(data.old_price),
+    )
+
+
+@database_sync_to_async
 def persist_offer_count(data: OfferCountPriceSchema):
     logging.info(f'KAFKA.MESSAGE.CONSUMED topic={OFFER_PRICE_COUNT_UPDATE_TOPIC} data={data.asdict()}')
+    metrics.increment(CONSUMER_MESSAGES_CONSUMED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
     try:
-        product = Product.objects.get(id=data.product_id)
-        product.offers_count = data.count
-        product.offers_min_price = data.price
-        product.offers_old_price = data.old_price
-        product.save()
-        logging.info(f'Offer count updated successfully {product.id}')
-
-    except Product.DoesNotExist:
-        logging.error(f'Product with id {data.product_id} does not exist')
+        with metrics.timer(CONSUMER_DB_WRITE_SECONDS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC):
+            updated = (
+                Product.objects.filter(id=data.product_id)
+                .exclude(**_offer_counters(data))
+                .update(**_offer_counters(data))
+            )
+        if updated:
+            ProductDocument.bulk_update_counters({data.product_id: _offer_counters(data)})
+            logging.info(f'Offer count updated successfully {data.product_id}')
+        elif Product.objects.filter(id=data.product_id).exists():
+            metrics.increment(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+            logging.info(f'Offer count is unchanged {data.product_id}')
+        else:
+            metrics.increment(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+            logging.error(f'Product with id {data.product_id} does not exist')
+
     except IntegrityError as e:
+        metrics.increment(CONSUMER_MESSAGES_FAILED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
         logging.error(f'Can not update product: {str(e)}')
 
 
-@sync_to_async
+@database_sync_to_async
+def persist_offer_count_batch(data_list: list[OfferCountPriceSchema]):
+    logging.info(f'KAFKA.BATCH.CONSUMED topic={OFFER_PRICE_COUNT_UPDATE_TOPIC} size={len(data_list)}')
+    metrics.increment(CONSUMER_MESSAGES_CONSUMED_METRIC, value=len(data_list), topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+    metrics.observe(
+        CONSUMER_BATCH_SIZE_METRIC,
+        len(data_list),
+        buckets=CONSUMER_BATCH_SIZE_BUCKETS,
+        topic=OFFER_PRICE_COUNT_UPDATE_TOPIC,
+    )
+    latest_offers = {data.product_id: data for data in data_list}
+    current_offers = {
+        product_id: (offers_count, offers_min_price, offers_old_price)
+        for product_id, offers_count, offers_min_price, offers_old_price in Product.objects.filter(
+            id__in=latest_offers.keys()
+        ).values_list('id', 'offers_count', 'offers_min_price', 'offers_old_price')
+    }
+    missing_ids = latest_offers.keys() - current_offers.keys()
+    for product_id in missing_ids:
+        metrics.increment(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+        logging.error(f'Product with id {product_id} does not exist')
+
+    changed_ids = {
+        product_id
+        for product_id, current_offer in current_offers.items()
+        if not _offer_is_unchanged(*current_offer, latest_offers[product_id])
+    }
+    skipped = len([data for data in data_list if data.product_id not in missing_ids]) - len(changed_ids)
+    if skipped:
+        metrics.increment(CONSUMER_MESSAGES_SKIPPED_METRIC, value=skipped, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+    if not changed_ids:
+        return
+
+    products = [
+        Product(id=data.product_id, **_offer_counters(data))
+        for data in latest_offers.values()
+        if data.product_id in changed_ids
+    ]
+    try:
+        with metrics.timer(CONSUMER_DB_WRITE_SECONDS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC):
+            with transaction.atomic():
+                updated = Product.objects.bulk_update(
+                    products, fields=['offers_count', 'offers_min_price', 'offers_old_price']
+                )
+        ProductDocument.bulk_update_counters(
+            {product_id: _offer_counters(latest_offers[product_id]) for product_id in changed_ids}
+        )
+        logging.info(f'Offer counts updated successfully count={updated}')
+
+    except IntegrityError as e:
+        metrics.increment(
+            CONSUMER_MESSAGES_FAILED_METRIC,
+            value=len([data for data in data_list if data.product_id in changed_ids]),
+            topic=OFFER_PRICE_COUNT_UPDATE_TOPIC,
+        )
+        logging.error(f'Can not update products: {str(e)}')
+
+
+async def consume_offer_counts(stream):
+    async for data in stream:
+        await persist_offer_count(data)
+        record_consumer_lag(stream)
+
+
+async def consume_offer_count_batches(stream):
+    # faust acks the events of a batch only after the loop body returns, so offsets
+    # are committed once the batch has been written
+    async for data_list in stream.take(OFFER_COUNT_BATCH_SIZE, within=OFFER_COUNT_BATCH_WINDOW_MS / 1000):
+        await persist_offer_count_batch(data_list)
+        record_consumer_lag(stream)
+
+
+async def consume_product_review_count_ratings(stream):
+    async for data in stream:
+        await persist_product_review_count_rating_update_topic(data)
+        record_consumer_lag(stream)
+
+
+def record_consumer_lag(stream):
+    event = stream.current_event
+    if event is None:
+        return
+    message = event.message
+    _consumed_offsets[message.tp] = message.offset
+    _set_consumer_lag(stream.app, message.tp, message.offset)
+    _ensure_consumer_metrics_task(stream.app)
+
+
+def _set_consumer_lag(app, tp, offset: int):
+    highwater = app.consumer.highwater(tp)
+    if highwater is not None:
+        metrics.set_gauge(CONSUMER_LAG_METRIC, max(highwater - offset - 1, 0), topic=tp.topic, partition=tp.partition)
+
+
+def _ensure_consumer_metrics_task(app):
+    global _consumer_metrics_task
+    if _consumer_metrics_task is None or _consumer_metrics_task.done():
+        _consumer_metrics_task = asyncio.ensure_future(report_consumer_metrics(app))
+
+
+async def report_consumer_metrics(app):
+    # refreshes lag from the broker highwater marks even when no message is processed,
+    # so a stalled consumer shows growing lag instead of a frozen gauge
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(METRICS_TEXTFILE_INTERVAL)
+        assignment = app.consumer.assignment()
+        for tp, offset in list(_consumed_offsets.items()):
+            if tp in assignment:
+                _set_consumer_lag(app, tp, offset)
+            else:
+                del _consumed_offsets[tp]
+        if METRICS_TEXTFILE:
+            worker = os.environ.get(CONSUMER_WORKER_ENV, f'consumer-{os.getpid()}')
+            await loop.run_in_executor(None, metrics.write_textfile, METRICS_TEXTFILE, worker)
+
+
+@database_sync_to_async
 def persist_product_review_count_rating_update_topic(data: ProductReviewCountRatingSchema):
     logging.info(f'KAFKA.MESSAGE.CONSUMED topic={PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC} data={data.asdict()}')
+    metrics.increment(CONSUMER_MESSAGES_CONSUMED_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC)
     try:
-        product = Product.objects.get(id=data.product_id)
-        product.rating = data.rating
-        product.reviews_count = data.reviews_count
-        product.save()
-        logging.info(f'Product review and rating updated successfully {product.id}')
-
-    except Product.DoesNotExist:
-        logging.error(f'Product with id {data.product_id} does not exist')
+        with metrics.timer(CONSUMER_DB_WRITE_SECONDS_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC):
+            updated = (
+                Product.objects.filter(id=data.product_id)
+                .exclude(reviews_count=data.reviews_count, rating=data.rating)
+                .update(reviews_count=data.reviews_count, rating=data.rating)
+            )
+        if updated:
+            ProductDocument.bulk_update_counters(
+                {data.product_id: dict(reviews_count=data.reviews_count, rating=data.rating)}
+            )
+            logging.info(f'Product review and rating updated successfully {data.product_id}')
+        elif Product.objects.filter(id=data.product_id).exists():
+            metrics.increment(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC)
+            logging.info(f'Product review and rating are unchanged {data.product_id}')
+        else:
+            metrics.increment(CONSUMER_MISSING_PRODUCTS_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC)
+            logging.error(f'Product with id {data.product_id} does not exist')
+
     except IntegrityError as e:
+        metrics.increment(CONSUMER_MESSAGES_FAILED_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC)
         logging.error(f'Can not update product: {str(e)}')
@@ -0,0 +1,55 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from colors.models import ColorGroup
+from features.models import Feature
+from products.constants import DIMENSION_CACHE_TTL
+
+
+class DimensionCache:
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._color_groups = {}
+        self._features = {}
+
+    def invalidate(self, **kwargs):
+        with self._lock:
+            self._loaded_at = None
+
+    def get_color_groups(self, color_id: int) -> list:
+        self._ensure_loaded()
+        return [dict(color_group) for color_group in self._color_groups.get(color_id, [])]
+
+    def get_feature(self, feature_id: int) -> Optional[dict]:
+        self._ensure_loaded()
+        if feature_id not in self._features:
+            self.invalidate()
+            self._ensure_loaded()
+        if feature_id not in self._features:
+            logging.warning(f'Feature {feature_id} not found, skipping it in the product document')
+            return None
+        return self._features[feature_id]
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            color_groups = defaultdict(list)
+            for color_group_id, name, image, color_id in ColorGroup.objects.filter(colors__isnull=False).values_list(
+                'id', 'name', 'image', 'colors'
+            ):
+                color_groups[color_id].append({'id': color_group_id, 'name': name, 'image': image})
+            self._color_groups = dict(color_groups)
+            self._features = {
+                feature_id: {'id': feature_id, 'name': name, 'is_main': is_main}
+                for feature_id, name, is_main in Feature.objects.values_list('id', 'name', 'is_main')
+            }
+            self._loaded_at = time.monotonic()
+
+
+dimension_cache = DimensionCache(ttl=DIMENSION_CACHE_TTL)
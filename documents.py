@@ -1,12 +1,34 @@
+import logging
+import threading
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models import prefetch_related_objects
 from django_elasticsearch_dsl import Document
 from django_elasticsearch_dsl import fields
 from django_elasticsearch_dsl.registries import registry
+from elasticsearch.helpers import bulk
 
-from colors.models import ColorGroup
-from products.models import Feature
+from products.constants import PRODUCT_INDEX_CHUNK_SIZE
+from products.dimensions import dimension_cache
+from products.indexing import product_index_queue
 from products.models import Product
+from products.models import ProductFeature
 from products.models import ProductFeatureValue
 
+_pending_master_ids = threading.local()
+
+
+def get_product_features_prefetch(lookup: str) -> Prefetch:
+    product_features = ProductFeature.objects.prefetch_related(
+        Prefetch(
+            'selected_values',
+            queryset=ProductFeatureValue.objects.select_related('feature_value'),
+            to_attr='prefetched_values',
+        )
+    )
+    return Prefetch(lookup, queryset=product_features, to_attr='prefetched_features')
+
 
 @registry.register_document
 class ProductDocument(Document):
@@ -26,6 +48,7 @@ class ProductDocument(Document):
         }
     )
     color_id = fields.IntegerField()
+    master_id = fields.IntegerField()
     brand = fields.ObjectField(
         properties={
             'id': fields.IntegerField(),
@@ -33,7 +56,7 @@ class ProductDocument(Document):
         }
     )
     reviews_count = fields.IntegerField()
-    rating = fields.IntegerField()
+    rating = fields.FloatField()
     color_groups = fields.NestedField(
         properties={
             'id': fields.IntegerField(),
@@ -80,11 +103,70 @@ class ProductDocument(Document):
             'offers_old_price',
             'created_at',
         ]
+        queryset_pagination = PRODUCT_INDEX_CHUNK_SIZE
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related('master', 'brand', 'category')
+            .prefetch_related(
+                get_product_features_prefetch('features'),
+                get_product_features_prefetch('master__features'),
+            )
+        )
+
+    @classmethod
+    def get_pending_master_ids(cls) -> set:
+        if not hasattr(_pending_master_ids, 'ids'):
+            _pending_master_ids.ids = set()
+        return _pending_master_ids.ids
+
+    @classmethod
+    def reindex_master_variations(cls, master_id: int):
+        cls.get_pending_master_ids().add(master_id)
+        transaction.on_commit(cls.flush_master_variations)
+
+    @classmethod
+    def flush_master_variations(cls):
+        master_ids = set(cls.get_pending_master_ids())
+        cls.get_pending_master_ids().clear()
+        if not master_ids:
+            return
+        product_index_queue.enqueue(Product.objects.filter(master_id__in=master_ids).values_list('id', flat=True))
+
+    def get_product_features(self, instance) -> list:
+        products = [instance, instance.master] if instance.master_id else [instance]
+        prefetch_related_objects(
+            [product for product in products if not hasattr(product, 'prefetched_features')],
+            get_product_features_prefetch('features'),
+        )
+        return [product_feature for product in products for product_feature in product.prefetched_features]
+
+    @classmethod
+    def bulk_update_counters(cls, counters: dict):
+        actions = [
+            {'_op_type': 'update', '_index': cls._index._name, '_id': product_id, 'doc': fields}
+            for product_id, fields in counters.items()
+        ]
+        try:
+            _, errors = bulk(cls._get_connection(), actions, raise_on_error=False)
+        except Exception as e:
+            logging.error(f'Can not update product document counters: {str(e)}')
+            product_index_queue.enqueue(counters.keys())
+            return
+        failed_ids = []
+        for error in errors:
+            logging.error(f'Can not update product document counters: {error}')
+            failed_ids.append(int(next(iter(error.values()))['_id']))
+        if failed_ids:
+            product_index_queue.enqueue(failed_ids)
 
     def prepare_color_id(self, instance):
-        if instance.color:
-            return instance.color.id
-        return None
+        return instance.color_id
+
+    def prepare_master_id(self, instance):
+        return instance.master_id
 
     def prepare_common_name(self, instance):
         if instance.master:
@@ -112,41 +194,35 @@ class ProductDocument(Document):
         return instance.rating
 
     def prepare_color_groups(self, instance):
-        color_groups = []
-        if instance.color:
-            color_groups_qs = ColorGroup.objects.filter(colors__in=[instance.color]).distinct()
-            for color_group in color_groups_qs:
-                color_groups.append({
-                    'id': color_group.id,
-                    'name': color_group.name,
-                    'image': color_group.image,
-                })
-        return color_groups
+        if instance.color_id:
+            return dimension_cache.get_color_groups(instance.color_id)
+        return []
 
     def prepare_features(self, instance):
         features = []
-        product_features = Feature.objects.filter(products__product__in=[instance, instance.master])
-        for feature in product_features:
+        for product_feature in self.get_product_features(instance):
+            feature = dimension_cache.get_feature(product_feature.feature_id)
+            if feature is None:
+                continue
             features.append({
-                'id': feature.id,
-                'name': feature.name
+                'id': feature['id'],
+                'name': feature['name']
             })
         return features
 
     def prepare_feature_values(self, instance):
         feature_values = []
-        product_feature_values = ProductFeatureValue.objects.filter(
-            product_feature__product__in=[instance, instance.master]
-        ).distinct().select_related('feature_value__feature')
-
-        for product_feature_value in product_feature_values:
-            feature_values.append({
-                'feature_name': product_feature_value.feature_value.feature.name,
-                'feature_id': product_feature_value.feature_value.feature.id,
-                'feature_is_main': product_feature_value.feature_value.feature.is_main,
-                'id': product_feature_value.feature_value.id,
-                'name': product_feature_value.feature_value.value,
-            })
+        for product_feature in self.get_product_features(instance):
+            for product_feature_value in product_feature.prefetched_values:
+                feature = dimension_cache.get_feature(product_feature_value.feature_value.feature_id)
+                if feature is None:
+                    continue
+                feature_values.append({
+                    'feature_name': feature['name'],
+                    'feature_id': feature['id'],
+                    'feature_is_main': feature['is_main'],
+                    'id': product_feature_value.feature_value.id,
+                    'name': product_feature_value.feature_value.value,
+                })
 
         return feature_values
-
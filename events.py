@@ -0,0 +1,168 @@
+from typing import Optional
+
+from products.constants import PRODUCT_EVENTS_ENCODING
+from products.constants import PRODUCT_UPDATE_EVENTS_CHANGED_ONLY
+from products.models import Product
+
+COMPACT_ENCODING = 'compact'
+
+
+class ProductEvent:
+    __slots__ = ()
+    fields = ()
+    schema = None
+    version = 1
+    key_field = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.fields + cls.__slots__
+
+    def __init__(self, **kwargs):
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field))
+
+    @property
+    def key(self):
+        return getattr(self, self.key_field)
+
+    def copy(self) -> 'ProductEvent':
+        return type(self)(**{field: getattr(self, field) for field in self.fields})
+
+    def merge(self, previous_event: 'ProductEvent') -> 'ProductEvent':
+        return self
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.fields}
+
+    def to_compact(self) -> dict:
+        return {'s': self.schema, 'v': self.version, 'd': [getattr(self, field) for field in self.fields]}
+
+
+class ProductSnapshotEvent(ProductEvent):
+    __slots__ = (
+        'product_id',
+        'master_id',
+        'common_name',
+        'variant_name',
+        'slug',
+        'brand_id',
+        'category_id',
+        'main_photo',
+        'photos',
+        'video_urls',
+        'description',
+        'is_visible',
+    )
+    schema = 'product'
+    key_field = 'product_id'
+
+    @classmethod
+    def from_product(cls, product: Product) -> 'ProductSnapshotEvent':
+        return cls(
+            product_id=product.id,
+            master_id=product.master_id,
+            common_name=product.master.common_name,
+            variant_name=product.variant_name,
+            slug=product.slug,
+            brand_id=product.brand_id,
+            category_id=product.category_id,
+            main_photo=product.main_photo,
+            photos=product.photos,
+            video_urls=product.video_urls,
+            description=product.description,
+            is_visible=product.is_visible,
+        )
+
+
+class ProductUpdateEvent(ProductSnapshotEvent):
+    __slots__ = ('changed_fields',)
+    schema = 'product_update'
+
+    @classmethod
+    def from_product_diff(
+        cls, product: Product, previous_state: Optional[ProductSnapshotEvent] = None
+    ) -> 'ProductUpdateEvent':
+        event = cls.from_product(product=product)
+        if previous_state is not None:
+            event.changed_fields = [
+                field
+                for field in ProductSnapshotEvent.fields
+                if getattr(previous_state, field) != getattr(event, field)
+            ]
+        return event
+
+    def merge(self, previous_event: ProductEvent) -> ProductEvent:
+        merged_event = self.copy()
+        if self.changed_fields is None or getattr(previous_event, 'changed_fields', None) is None:
+            merged_event.changed_fields = None
+        else:
+            merged_event.changed_fields = list(dict.fromkeys(previous_event.changed_fields + self.changed_fields))
+        return merged_event
+
+    def is_changed(self, field: str) -> bool:
+        return field in ('product_id', 'master_id', 'changed_fields') or field in self.changed_fields
+
+    def to_dict(self) -> dict:
+        if self.changed_fields is None or not PRODUCT_UPDATE_EVENTS_CHANGED_ONLY:
+            return super().to_dict()
+        return {field: getattr(self, field) for field in self.fields if self.is_changed(field)}
+
+    def to_compact(self) -> dict:
+        if self.changed_fields is None or not PRODUCT_UPDATE_EVENTS_CHANGED_ONLY:
+            return super().to_compact()
+        return {
+            's': self.schema,
+            'v': self.version,
+            'd': [getattr(self, field) if self.is_changed(field) else None for field in self.fields],
+        }
+
+
+class ProductSlugAndCommonNameBulkUpdateEvent(ProductEvent):
+    __slots__ = ('master_id', 'master_product_slug', 'new_slug', 'common_name')
+    schema = 'product_slug_and_common_name_bulk_update'
+    key_field = 'master_id'
+
+
+class ProductBrandBulkUpdateEvent(ProductEvent):
+    __slots__ = ('master_id', 'brand_id')
+    schema = 'product_brand_bulk_update'
+    key_field = 'master_id'
+
+
+class ProductDeleteEvent(ProductEvent):
+    __slots__ = ('product_id',)
+    schema = 'product_delete'
+    key_field = 'product_id'
+
+
+class MasterProductDeleteEvent(ProductEvent):
+    __slots__ = ('master_id',)
+    schema = 'master_product_delete'
+    key_field = 'master_id'
+
+
+SCHEMA_REGISTRY = {
+    (event_class.schema, event_class.version): event_class
+    for event_class in (
+        ProductSnapshotEvent,
+        ProductUpdateEvent,
+        ProductSlugAndCommonNameBulkUpdateEvent,
+        ProductBrandBulkUpdateEvent,
+        ProductDeleteEvent,
+        MasterProductDeleteEvent,
+    )
+}
+
+
+def encode_event(event: ProductEvent, encoding: str = PRODUCT_EVENTS_ENCODING) -> dict:
+    if encoding == COMPACT_ENCODING:
+        return event.to_compact()
+    return event.to_dict()
+
+
+def decode_event(payload: dict) -> dict:
+    if 's' not in payload or 'v' not in payload:
+        return payload
+    event_class = SCHEMA_REGISTRY[(payload['s'], payload['v'])]
+    return dict(zip(event_class.fields, payload['d']))
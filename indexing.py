@@ -0,0 +1,68 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+from django.db import transaction
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+
+from products.constants import PRODUCT_INDEX_CHUNK_SIZE
+from products.constants import PRODUCT_INDEX_QUEUE_WINDOW_MS
+from products.models import Product
+
+
+class ProductIndexQueue:
+    def __init__(self, window_ms: int, chunk_size: int):
+        self.window = window_ms / 1000
+        self.chunk_size = chunk_size
+        self._product_ids = set()
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def enqueue(self, product_ids):
+        with self._lock:
+            self._product_ids.update(product_ids)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='products-index-queue', daemon=True)
+                self._thread.start()
+        self._pending.set()
+
+    def flush(self):
+        with self._lock:
+            product_ids = list(self._product_ids)
+            self._product_ids.clear()
+        if not product_ids:
+            return
+        from products.documents import ProductDocument
+
+        document = ProductDocument()
+        for start in range(0, len(product_ids), self.chunk_size):
+            chunk_ids = product_ids[start:start + self.chunk_size]
+            try:
+                document.update(document.get_queryset().filter(id__in=chunk_ids))
+            except Exception as e:
+                logging.error(f'Can not index products, retrying in the next window: {str(e)}')
+                self.enqueue(chunk_ids)
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            time.sleep(self.window)
+            close_old_connections()
+            self.flush()
+            close_old_connections()
+
+
+product_index_queue = ProductIndexQueue(window_ms=PRODUCT_INDEX_QUEUE_WINDOW_MS, chunk_size=PRODUCT_INDEX_CHUNK_SIZE)
+
+
+class QueuedSignalProcessor(RealTimeSignalProcessor):
+    def handle_save(self, sender, instance, **kwargs):
+        if not isinstance(instance, Product):
+            return super().handle_save(sender, instance, **kwargs)
+        product_id = instance.pk
+        transaction.on_commit(lambda: product_index_queue.enqueue([product_id]))
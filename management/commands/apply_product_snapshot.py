@@ -0,0 +1,137 @@
+import csv
+import json
+import tempfile
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import DataError
+from django.db import IntegrityError
+from django.db import connection
+from django.db import transaction
+
+from products.documents import ProductDocument
+from products.indexing import product_index_queue
+from products.models import Product
+
+SNAPSHOT_KINDS = {
+    'offers': {
+        'count': ('offers_count', 'integer'),
+        'price': ('offers_min_price', 'numeric(20, 4)'),
+        'old_price': ('offers_old_price', 'numeric(20, 4)'),
+    },
+    'reviews': {
+        'reviews_count': ('reviews_count', 'integer'),
+        'rating': ('rating', 'double precision'),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Applies an NDJSON or CSV snapshot of offer counters or review ratings with one set-based UPDATE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--kind', choices=SNAPSHOT_KINDS.keys(), default='offers')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default=None)
+        parser.add_argument('--reindex-chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        columns = SNAPSHOT_KINDS[options['kind']]
+        snapshot_format = options['format'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+        started_at = time.perf_counter()
+
+        with tempfile.SpooledTemporaryFile(mode='w+', max_size=64 * 1024 * 1024) as rows:
+            loaded = self.write_copy_rows(
+                path=options['path'], snapshot_format=snapshot_format, columns=columns, rows=rows
+            )
+            rows.seek(0)
+            try:
+                with transaction.atomic():
+                    updated_rows = self.apply_snapshot(columns=columns, rows=rows)
+            except (DataError, IntegrityError) as e:
+                raise CommandError(f'Can not apply snapshot: {str(e)}')
+
+        reindex_fields = [field for field, _ in columns.values()]
+        for start in range(0, len(updated_rows), options['reindex_chunk_size']):
+            ProductDocument.bulk_update_counters(
+                {
+                    updated_row[0]: dict(zip(reindex_fields, updated_row[1:]))
+                    for updated_row in updated_rows[start:start + options['reindex_chunk_size']]
+                }
+            )
+        product_index_queue.flush()
+
+        self.stdout.write(
+            f'Loaded {loaded} rows, updated {len(updated_rows)} products '
+            f'in {time.perf_counter() - started_at:.1f}s'
+        )
+
+    def write_copy_rows(self, path: str, snapshot_format: str, columns: dict, rows) -> int:
+        writer = csv.writer(rows)
+        loaded = 0
+        try:
+            with open(path, newline='') as snapshot:
+                if snapshot_format == 'csv':
+                    records = enumerate(csv.DictReader(snapshot), start=2)
+                else:
+                    records = (
+                        (number, json.loads(line)) for number, line in enumerate(snapshot, start=1) if line.strip()
+                    )
+                for line_number, record in records:
+                    writer.writerow(self.get_copy_row(line_number=line_number, record=record, columns=columns))
+                    loaded += 1
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Can not read snapshot: {str(e)}')
+        return loaded
+
+    def get_copy_row(self, line_number: int, record, columns: dict) -> list:
+        if not isinstance(record, dict):
+            raise CommandError(f'Line {line_number}: expected an object, got {record!r}')
+        copy_row = []
+        for name, (field, column_type) in {'product_id': ('id', 'bigint'), **columns}.items():
+            value = record.get(name)
+            if value in (None, ''):
+                if not Product._meta.get_field(field).null:
+                    raise CommandError(f'Line {line_number}: {name} is required')
+                copy_row.append('')
+                continue
+            try:
+                number = Decimal(str(value))
+                if not number.is_finite() or isinstance(value, bool):
+                    raise ValueError
+                if column_type in ('bigint', 'integer'):
+                    if number != number.to_integral_value():
+                        raise ValueError
+                    number = int(number)
+            except (ArithmeticError, ValueError):
+                raise CommandError(f'Line {line_number}: {name} must be a number, got {value!r}')
+            copy_row.append(number)
+        return copy_row
+
+    def apply_snapshot(self, columns: dict, rows) -> list:
+        snapshot_columns = ', '.join(f'{name} {column_type}' for name, (_, column_type) in columns.items())
+        copy_columns = ', '.join(['product_id', *columns.keys()])
+        assignments = ', '.join(f'{field} = snapshot.{name}' for name, (field, _) in columns.items())
+        product_values = ', '.join(f'product.{field}' for field, _ in columns.values())
+        snapshot_values = ', '.join(f'snapshot.{name}' for name in columns.keys())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE product_snapshot '
+                f'(line bigserial, product_id bigint NOT NULL, {snapshot_columns}) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                f"COPY product_snapshot ({copy_columns}) FROM STDIN WITH (FORMAT csv, NULL '')", rows
+            )
+            cursor.execute(
+                f'UPDATE {Product._meta.db_table} AS product '
+                f'SET {assignments} '
+                f'FROM (SELECT DISTINCT ON (product_id) * FROM product_snapshot ORDER BY product_id, line DESC) '
+                f'AS snapshot '
+                f'WHERE product.id = snapshot.product_id '
+                f'AND ({product_values}) IS DISTINCT FROM ({snapshot_values}) '
+                f'RETURNING product.id, {product_values}'
+            )
+            return cursor.fetchall()
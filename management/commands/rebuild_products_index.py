@@ -0,0 +1,125 @@
+import itertools
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.utils import timezone
+from elasticsearch.helpers import bulk
+from elasticsearch.helpers import scan
+
+from products.constants import PRODUCT_INDEX_CHUNK_SIZE
+from products.constants import PRODUCT_INDEX_SYNC_STATE_NAME
+from products.documents import ProductDocument
+from products.management.commands.reindex_products import reindex_products
+from products.models import Product
+from products.models import ProductIndexSyncState
+
+CATCH_UP_FIELDS = ('offers_count', 'offers_min_price', 'offers_old_price', 'reviews_count', 'rating')
+
+
+class Command(BaseCommand):
+    help = 'Builds a new versioned products index and swaps the products alias to it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--ids-per-task', type=int, default=10000)
+        parser.add_argument('--bulk-threads', type=int, default=2)
+        parser.add_argument('--keep', type=int, default=1)
+        parser.add_argument('--max-missing-ratio', type=float, default=0.001)
+        parser.add_argument('--catch-up-chunk-size', type=int, default=PRODUCT_INDEX_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        client = ProductDocument._get_connection()
+        alias = ProductDocument._index._name
+        versions = self.get_versions(client=client, alias=alias)
+        index_name = f'{alias}_v{max(versions, default=0) + 1}'
+
+        started_at = timezone.now()
+        ProductDocument._index.clone(name=index_name).create()
+        self.stdout.write(f'Created {index_name}')
+        reindex_products(
+            index_name=index_name,
+            workers=options['workers'],
+            ids_per_task=options['ids_per_task'],
+            bulk_threads=options['bulk_threads'],
+            stdout=self.stdout,
+        )
+
+        indexed_count = client.count(index=index_name)['count']
+        expected_count = ProductDocument().get_queryset().filter(created_at__lt=started_at).count()
+        if indexed_count < expected_count * (1 - options['max_missing_ratio']):
+            client.indices.delete(index=index_name)
+            raise CommandError(f'{index_name} has {indexed_count} documents, expected {expected_count}; alias kept')
+
+        self.swap_alias(client=client, alias=alias, index_name=index_name)
+        ProductIndexSyncState.objects.update_or_create(
+            name=PRODUCT_INDEX_SYNC_STATE_NAME, defaults={'synced_until': started_at}
+        )
+        self.stdout.write(f'Alias {alias} now points to {index_name}')
+        updated, deleted = self.catch_up(
+            client=client, index_name=index_name, chunk_size=options['catch_up_chunk_size']
+        )
+        self.stdout.write(f'Caught up {updated} counter updates and {deleted} deletes made during the build')
+
+        for version in sorted(versions, reverse=True)[options['keep']:]:
+            client.indices.delete(index=f'{alias}_v{version}', ignore_unavailable=True)
+            self.stdout.write(f'Deleted {alias}_v{version}')
+
+    def get_versions(self, client, alias: str) -> list:
+        versions = []
+        for name in client.indices.get(index=f'{alias}_v*', ignore_unavailable=True, allow_no_indices=True):
+            version = name[len(f'{alias}_v'):]
+            if version.isdigit():
+                versions.append(int(version))
+        return versions
+
+    def swap_alias(self, client, alias: str, index_name: str):
+        actions = [{'add': {'index': index_name, 'alias': alias}}]
+        if client.indices.exists_alias(name=alias):
+            for aliased_index in client.indices.get_alias(name=alias):
+                actions.insert(0, {'remove': {'index': aliased_index, 'alias': alias}})
+        elif client.indices.exists(index=alias):
+            actions.insert(0, {'remove_index': {'index': alias}})
+        client.indices.update_aliases(body={'actions': actions})
+
+    def catch_up(self, client, index_name: str, chunk_size: int) -> tuple:
+        # counter updates and deletes made during the build went through the alias to the old index and
+        # do not bump updated_at, so replay them from the database once the alias points to the new index
+        hits = scan(client, index=index_name, query={'_source': list(CATCH_UP_FIELDS)}, size=chunk_size)
+        updated = deleted = 0
+        while True:
+            chunk = list(itertools.islice(hits, chunk_size))
+            if not chunk:
+                return updated, deleted
+            indexed = {int(hit['_id']): hit['_source'] for hit in chunk}
+            current = {
+                product_id: dict(zip(CATCH_UP_FIELDS, values))
+                for product_id, *values in Product.objects.filter(id__in=indexed.keys()).values_list(
+                    'id', *CATCH_UP_FIELDS
+                )
+            }
+            stale = {
+                product_id: counters
+                for product_id, counters in current.items()
+                if any(
+                    normalize_counter(counters[field]) != normalize_counter(indexed[product_id].get(field))
+                    for field in CATCH_UP_FIELDS
+                )
+            }
+            if stale:
+                ProductDocument.bulk_update_counters(stale)
+            deleted_ids = indexed.keys() - current.keys()
+            if deleted_ids:
+                bulk(
+                    client,
+                    [{'_op_type': 'delete', '_index': index_name, '_id': product_id} for product_id in deleted_ids],
+                    raise_on_error=False,
+                )
+            updated += len(stale)
+            deleted += len(deleted_ids)
+
+
+def normalize_counter(value):
+    if value is None:
+        return None
+    return float(value)
@@ -0,0 +1,94 @@
+import functools
+import logging
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max
+from django.db.models import Min
+from elasticsearch.helpers import parallel_bulk
+from elasticsearch_dsl.connections import connections as es_connections
+
+from products.constants import PRODUCT_INDEX_CHUNK_SIZE
+from products.documents import ProductDocument
+from products.models import Product
+
+
+def init_worker():
+    es_connections.create_connection(alias='default', **settings.ELASTICSEARCH_DSL['default'])
+
+
+def index_id_range(id_range: tuple, index_name: str, thread_count: int) -> int:
+    document = ProductDocument()
+    products = document.get_queryset().filter(id__range=id_range).iterator(chunk_size=PRODUCT_INDEX_CHUNK_SIZE)
+    actions = (dict(document._prepare_action(product, 'index'), _index=index_name) for product in products)
+    indexed = 0
+    for ok, info in parallel_bulk(
+        document._get_connection(), actions, thread_count=thread_count, raise_on_error=False
+    ):
+        if ok:
+            indexed += 1
+        else:
+            logging.error(f'Can not index product document: {info}')
+    return indexed
+
+
+class Command(BaseCommand):
+    help = 'Reindexes products into Elasticsearch from parallel id-range chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--ids-per-task', type=int, default=10000)
+        parser.add_argument('--bulk-threads', type=int, default=2)
+        parser.add_argument('--index', default=None)
+
+    def handle(self, *args, **options):
+        index_name = options['index'] or ProductDocument._index._name
+        indexed = reindex_products(
+            index_name=index_name,
+            workers=options['workers'],
+            ids_per_task=options['ids_per_task'],
+            bulk_threads=options['bulk_threads'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(f'Indexed {indexed} products into {index_name}')
+
+
+def reindex_products(index_name: str, workers: int, ids_per_task: int, bulk_threads: int, stdout=None) -> int:
+    bounds = Product.objects.aggregate(min_id=Min('id'), max_id=Max('id'))
+    if bounds['min_id'] is None:
+        return 0
+    id_ranges = [
+        (start, min(start + ids_per_task - 1, bounds['max_id']))
+        for start in range(bounds['min_id'], bounds['max_id'] + 1, ids_per_task)
+    ]
+
+    client = ProductDocument._get_connection()
+    index_name, index_settings = next(iter(client.indices.get_settings(index=index_name).items()))
+    index_settings = index_settings['settings']['index']
+    client.indices.put_settings(index=index_name, body={'index': {'refresh_interval': '-1', 'number_of_replicas': 0}})
+    started_at = time.perf_counter()
+    indexed = 0
+    try:
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(processes=workers, initializer=init_worker) as pool:
+            index_range = functools.partial(index_id_range, index_name=index_name, thread_count=bulk_threads)
+            for range_indexed in pool.imap_unordered(index_range, id_ranges):
+                indexed += range_indexed
+                if stdout:
+                    elapsed = time.perf_counter() - started_at
+                    stdout.write(f'{indexed} docs, {indexed / elapsed:.0f} docs/sec')
+    finally:
+        client.indices.put_settings(
+            index=index_name,
+            body={
+                'index': {
+                    'refresh_interval': index_settings.get('refresh_interval'),
+                    'number_of_replicas': index_settings['number_of_replicas'],
+                }
+            },
+        )
+        client.indices.refresh(index=index_name)
+    return indexed
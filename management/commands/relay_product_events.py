@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products import metrics
+from products.constants import METRICS_TEXTFILE
+from products.constants import METRICS_TEXTFILE_INTERVAL
+from products.constants import PRODUCT_EVENTS_RELAY_BATCH_SIZE
+from products.constants import PRODUCT_EVENTS_RELAY_INTERVAL
+from products.product_producers import ProductProducer
+
+
+class Command(BaseCommand):
+    help = 'Publishes queued product events from the outbox table to Kafka'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PRODUCT_EVENTS_RELAY_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=PRODUCT_EVENTS_RELAY_INTERVAL)
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        self.metrics_written_at = -METRICS_TEXTFILE_INTERVAL
+        while True:
+            published = ProductProducer.relay_outbox_events(batch_size=options['batch_size'])
+            finished = options['once'] and published < options['batch_size']
+            self.write_metrics(force=finished)
+            if finished:
+                break
+            if published < options['batch_size']:
+                time.sleep(options['interval'])
+
+    def write_metrics(self, force: bool = False):
+        if not METRICS_TEXTFILE:
+            return
+        if force or time.monotonic() - self.metrics_written_at >= METRICS_TEXTFILE_INTERVAL:
+            metrics.write_textfile(METRICS_TEXTFILE, 'relay')
+            self.metrics_written_at = time.monotonic()
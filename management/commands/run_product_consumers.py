@@ -0,0 +1,70 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from products.constants import CONSUMER_DATA_DIR
+from products.constants import CONSUMER_FAUST_APP
+from products.constants import CONSUMER_WORKER_ENV
+
+
+class Command(BaseCommand):
+    help = 'Runs the product consumers as a pool of faust workers sharing one consumer group'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--app', default=CONSUMER_FAUST_APP)
+        parser.add_argument('--web-port', type=int, default=6066)
+        parser.add_argument('--loglevel', default='info')
+
+    def handle(self, *args, **options):
+        if not options['app']:
+            raise CommandError('Faust app is not configured, pass --app or set PRODUCTS_CONSUMER_FAUST_APP')
+        if options['workers'] < 1:
+            raise CommandError('At least one worker is required')
+
+        processes = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    '-m',
+                    'faust',
+                    '-A',
+                    options['app'],
+                    '--datadir',
+                    os.path.join(CONSUMER_DATA_DIR, f'worker-{number}'),
+                    'worker',
+                    '--loglevel',
+                    options['loglevel'],
+                    '--web-port',
+                    str(options['web_port'] + number),
+                ],
+                env={**os.environ, CONSUMER_WORKER_ENV: f'consumer-{number}'},
+            )
+            for number in range(options['workers'])
+        ]
+        self.stdout.write(f'Started {len(processes)} consumer workers for {options["app"]}')
+
+        def stop_workers(signum, frame):
+            for process in processes:
+                if process.poll() is None:
+                    process.send_signal(signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, stop_workers)
+        signal.signal(signal.SIGINT, stop_workers)
+
+        while True:
+            return_codes = [process.poll() for process in processes]
+            if all(return_code is not None for return_code in return_codes):
+                break
+            if any(return_code for return_code in return_codes):
+                stop_workers(signal.SIGTERM, None)
+            time.sleep(1)
+
+        failed = [process.pid for process in processes if process.returncode]
+        if failed:
+            raise CommandError(f'Consumer workers exited with errors: {failed}')
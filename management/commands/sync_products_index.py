@@ -0,0 +1,40 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from products.constants import PRODUCT_INDEX_CHUNK_SIZE
+from products.constants import PRODUCT_INDEX_SYNC_OVERLAP_SECONDS
+from products.constants import PRODUCT_INDEX_SYNC_STATE_NAME
+from products.documents import ProductDocument
+from products.models import Product
+from products.models import ProductIndexSyncState
+
+
+class Command(BaseCommand):
+    help = 'Reindexes products changed since the last run, tracked by an updated_at watermark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=PRODUCT_INDEX_CHUNK_SIZE)
+        parser.add_argument('--full', action='store_true')
+
+    def handle(self, *args, **options):
+        state, _ = ProductIndexSyncState.objects.get_or_create(name=PRODUCT_INDEX_SYNC_STATE_NAME)
+        started_at = timezone.now()
+
+        products = Product.objects.all()
+        if state.synced_until is not None and not options['full']:
+            products = products.filter(
+                updated_at__gte=state.synced_until - datetime.timedelta(seconds=PRODUCT_INDEX_SYNC_OVERLAP_SECONDS)
+            )
+        product_ids = list(products.order_by('id').values_list('id', flat=True))
+
+        document = ProductDocument()
+        for start in range(0, len(product_ids), options['chunk_size']):
+            chunk_ids = product_ids[start:start + options['chunk_size']]
+            document.update(document.get_queryset().filter(id__in=chunk_ids))
+
+        previous_synced_until = state.synced_until
+        state.synced_until = started_at
+        state.save()
+        self.stdout.write(f'Reindexed {len(product_ids)} products changed since {previous_synced_until}')
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_lock = threading.Lock()
+_counters = Counter()
+_gauges = {}
+_histograms = {}
+_histogram_buckets = {}
+
+
+def _metric_key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name: str, value: int = 1, **labels):
+    with _lock:
+        _counters[_metric_key(name, labels)] += value
+
+
+def get_counter(name: str, **labels) -> int:
+    with _lock:
+        return _counters[_metric_key(name, labels)]
+
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _gauges[_metric_key(name, labels)] = value
+
+
+def observe(name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels):
+    with _lock:
+        buckets = _histogram_buckets.setdefault(name, buckets)
+        bucket_counts, total, count = _histograms.get(_metric_key(name, labels), ([0] * len(buckets), 0, 0))
+        bucket_counts = [bucket_count + (value <= bucket) for bucket_count, bucket in zip(bucket_counts, buckets)]
+        _histograms[_metric_key(name, labels)] = (bucket_counts, total + value, count + 1)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started_at, **labels)
+
+
+def _format_labels(labels: tuple, **extra_labels) -> str:
+    labels = labels + tuple(extra_labels.items())
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+def render(**const_labels) -> str:
+    const_labels = tuple(sorted(const_labels.items()))
+    lines = []
+    with _lock:
+        for metric_type, samples in (('counter', _counters), ('gauge', _gauges)):
+            typed_names = set()
+            for (name, labels), value in sorted(samples.items()):
+                if name not in typed_names:
+                    lines.append(f'# TYPE {name} {metric_type}')
+                    typed_names.add(name)
+                lines.append(f'{name}{_format_labels(labels + const_labels)} {value}')
+
+        typed_names = set()
+        for (name, labels), (bucket_counts, total, count) in sorted(_histograms.items()):
+            labels = labels + const_labels
+            if name not in typed_names:
+                lines.append(f'# TYPE {name} histogram')
+                typed_names.add(name)
+            for bucket, bucket_count in zip(_histogram_buckets[name], bucket_counts):
+                lines.append(f'{name}_bucket{_format_labels(labels, le=bucket)} {bucket_count}')
+            lines.append(f'{name}_bucket{_format_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def get_textfile_path(path: str, worker: str) -> str:
+    root, extension = os.path.splitext(path)
+    return f'{root}-{worker}{extension}'
+
+
+def write_textfile(path: str, worker: str):
+    # every process keeps its own registry, so each one writes its own file labelled with its worker
+    path = get_textfile_path(path, worker)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w') as textfile:
+        textfile.write(render(worker=worker))
+    os.replace(temporary_path, path)
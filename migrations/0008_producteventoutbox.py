@@ -0,0 +1,27 @@
+# Generated by Django 4.1.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.core.serializers.json
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_alter_product_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductEventOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('topic', models.CharField(max_length=255)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
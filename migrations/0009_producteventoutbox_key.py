@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_producteventoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producteventoutbox',
+            name='key',
+            field=models.CharField(max_length=255, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from auditlog.registry import auditlog
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from brands.models import Brand
@@ -35,6 +36,9 @@ class Product(TimestampModel):
     reviews_count = models.IntegerField(default=0)
     rating = models.FloatField(null=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['updated_at'], name='product_updated_at_idx')]
+
     def __str__(self) -> str:
         return f'{self.common_name} {self.variant_name}'
 
@@ -55,6 +59,23 @@ class ProductFeatureValue(TimestampModel):
         return f'{self.product_feature.product} - {self.feature_value.value}'
 
 
+class ProductEventOutbox(TimestampModel):
+    topic = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, null=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    def __str__(self) -> str:
+        return f'{self.topic} {self.id}'
+
+
+class ProductIndexSyncState(TimestampModel):
+    name = models.CharField(max_length=255, unique=True)
+    synced_until = models.DateTimeField(null=True)
+
+    def __str__(self) -> str:
+        return f'{self.name} {self.synced_until}'
+
+
 auditlog.register(Product, exclude_fields=['updated_at'], serialize_data=True, serialize_auditlog_fields_only=True)
 auditlog.register(
     ProductFeature, exclude_fields=['updated_at'], serialize_data=True, serialize_auditlog_fields_only=True
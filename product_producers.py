@@ -1,58 +1,131 @@
 import logging
+import threading
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
 
 from common.constants import MASTER_PRODUCT_DELETE_TOPIC
 from common.constants import PRODUCT_CREATE_TOPIC
 from common.constants import PRODUCT_DELETE_TOPIC
 from common.constants import PRODUCT_SLUG_AND_COMMON_NAME_BULK_UPDATE_TOPIC
 from common.constants import PRODUCT_UPDATE_TOPIC
+from products import metrics
+from products.constants import PRODUCER_EVENTS_DELIVERED_METRIC
+from products.constants import PRODUCER_EVENTS_FAILED_METRIC
+from products.constants import PRODUCER_PUBLISH_SECONDS_METRIC
+from products.constants import PRODUCT_BRAND_BULK_UPDATE_TOPIC
+from products.events import MasterProductDeleteEvent
+from products.events import ProductBrandBulkUpdateEvent
+from products.events import ProductDeleteEvent
+from products.events import ProductEvent
+from products.events import ProductSlugAndCommonNameBulkUpdateEvent
+from products.events import ProductSnapshotEvent
+from products.events import ProductUpdateEvent
+from products.events import encode_event
 from products.models import Product
+from products.models import ProductEventOutbox
 from project.producer import MessagePublisher
 
 kafka_messenger = MessagePublisher()
 
 
+_pending_events = threading.local()
+
+
 class ProductProducer:
+    @classmethod
+    def publish(cls, topic: str, event: ProductEvent):
+        cls.bulk_publish(topic=topic, events=[event])
+
+    @classmethod
+    def bulk_publish(cls, topic: str, events: list):
+        if not transaction.get_connection().in_atomic_block:
+            ProductEventOutbox.objects.bulk_create(
+                [ProductEventOutbox(topic=topic, key=str(event.key), data=encode_event(event)) for event in events]
+            )
+            logging.info(f'KAFKA.MESSAGES.QUEUED topic={topic} count={len(events)}')
+            return
+
+        pending = cls.get_pending_events()
+        new_events = {}
+        for event in events:
+            if (topic, event.key) in pending:
+                outbox_id, previous_event = pending[(topic, event.key)]
+                merged_event = event.merge(previous_event)
+                if ProductEventOutbox.objects.filter(id=outbox_id).update(data=encode_event(merged_event)):
+                    pending[(topic, event.key)] = (outbox_id, merged_event)
+                    logging.info(f'KAFKA.MESSAGE.COALESCED topic={topic} key={event.key}')
+                    continue
+            new_events[event.key] = event
+
+        outbox_events = ProductEventOutbox.objects.bulk_create(
+            [ProductEventOutbox(topic=topic, key=str(event.key), data=encode_event(event)) for event in new_events.values()]
+        )
+        for outbox_event, event in zip(outbox_events, new_events.values()):
+            pending[(topic, event.key)] = (outbox_event.id, event)
+        if new_events:
+            transaction.on_commit(cls.clear_pending_events)
+            logging.info(f'KAFKA.MESSAGES.QUEUED topic={topic} count={len(new_events)}')
+
+    @classmethod
+    def get_pending_events(cls) -> dict:
+        if not hasattr(_pending_events, 'events'):
+            _pending_events.events = {}
+        return _pending_events.events
+
+    @classmethod
+    def clear_pending_events(cls):
+        cls.get_pending_events().clear()
+
+    @classmethod
+    @transaction.atomic
+    def relay_outbox_events(cls, batch_size: int) -> int:
+        events = list(ProductEventOutbox.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size])
+        published_ids = []
+        failed_keys = set()
+        for event in events:
+            # once a key fails, its later rows wait for the next pass so per-key order holds
+            if event.key in failed_keys:
+                continue
+            try:
+                with metrics.timer(PRODUCER_PUBLISH_SECONDS_METRIC, topic=event.topic):
+                    kafka_messenger.publish(topic=event.topic, data=event.data, key=event.key)
+            except Exception as e:
+                failed_keys.add(event.key)
+                metrics.increment(PRODUCER_EVENTS_FAILED_METRIC, topic=event.topic)
+                logging.error(f'KAFKA.MESSAGE.FAILED topic={event.topic} key={event.key} error={str(e)}')
+            else:
+                published_ids.append(event.id)
+                metrics.increment(PRODUCER_EVENTS_DELIVERED_METRIC, topic=event.topic)
+                logging.info(f'KAFKA.MESSAGE.PRODUCED topic={event.topic} key={event.key}')
+        ProductEventOutbox.objects.filter(id__in=published_ids).delete()
+        return len(published_ids)
+
     @classmethod
     def product_create(cls, product: Product):
         topic = PRODUCT_CREATE_TOPIC
 
-        data = dict(
-            product_id=product.id,
-            master_id=product.master.id,
-            common_name=product.master.common_name,
-            variant_name=product.variant_name,
-            slug=product.slug,
-            brand_id=product.brand.id,
-            category_id=product.category.id,
-            main_photo=product.main_photo,
-            photos=product.photos,
-            video_urls=product.video_urls,
-            description=product.description,
-            is_visible=product.is_visible,
-        )
-        kafka_messenger.publish(topic=topic, data=data)
-        logging.info(f'KAFKA.MESSAGE.PRODUCED topic={topic} data={data}')
+        event = ProductSnapshotEvent.from_product(product=product)
+        cls.publish(topic=topic, event=event)
 
     @classmethod
-    def product_update(cls, product: Product):
+    def product_update(cls, product: Product, previous_state: Optional[ProductSnapshotEvent] = None):
         topic = PRODUCT_UPDATE_TOPIC
 
-        data = dict(
-            product_id=product.id,
-            master_id=product.master.id,
-            common_name=product.master.common_name,
-            variant_name=product.variant_name,
-            slug=product.slug,
-            brand_id=product.brand.id,
-            category_id=product.category.id,
-            main_photo=product.main_photo,
-            photos=product.photos,
-            video_urls=product.video_urls,
-            description=product.description,
-            is_visible=product.is_visible,
-        )
-        kafka_messenger.publish(topic=topic, data=data)
-        logging.info(f'KAFKA.MESSAGE.PRODUCED topic={topic} data={data}')
+        event = ProductUpdateEvent.from_product_diff(product=product, previous_state=previous_state)
+        cls.publish(topic=topic, event=event)
+
+    @classmethod
+    def bulk_product_update(cls, products: QuerySet[Product], changed_fields: Optional[list] = None):
+        topic = PRODUCT_UPDATE_TOPIC
+
+        events = []
+        for product in products.select_related('master'):
+            event = ProductUpdateEvent.from_product(product=product)
+            event.changed_fields = changed_fields
+            events.append(event)
+        cls.bulk_publish(topic=topic, events=events)
 
     @classmethod
     def master_product_bulk_update_products_slug_and_common_name(
@@ -60,28 +133,28 @@ class ProductProducer:
     ):
         topic = PRODUCT_SLUG_AND_COMMON_NAME_BULK_UPDATE_TOPIC
 
-        data = dict(
+        event = ProductSlugAndCommonNameBulkUpdateEvent(
             master_id=master_product.id, master_product_slug=master_product.slug, new_slug=slug, common_name=common_name
         )
-        kafka_messenger.publish(topic=topic, data=data)
-        logging.info(f'KAFKA.MESSAGE.PRODUCED topic={topic} data={data}')
+        cls.publish(topic=topic, event=event)
+
+    @classmethod
+    def master_product_bulk_update_products_brand(cls, master_product: Product, brand_id: int):
+        topic = PRODUCT_BRAND_BULK_UPDATE_TOPIC
+
+        event = ProductBrandBulkUpdateEvent(master_id=master_product.id, brand_id=brand_id)
+        cls.publish(topic=topic, event=event)
 
     @classmethod
     def product_delete(cls, product_id: int):
         topic = PRODUCT_DELETE_TOPIC
 
-        data = dict(
-            product_id=product_id,
-        )
-        kafka_messenger.publish(topic=topic, data=data)
-        logging.info(f'KAFKA.MESSAGE.PRODUCED topic={topic} data={data}')
+        event = ProductDeleteEvent(product_id=product_id)
+        cls.publish(topic=topic, event=event)
 
     @classmethod
     def master_product_delete(cls, master_id: int):
         topic = MASTER_PRODUCT_DELETE_TOPIC
 
-        data = dict(
-            master_id=master_id,
-        )
-        kafka_messenger.publish(topic=topic, data=data)
-        logging.info(f'KAFKA.MESSAGE.PRODUCED topic={topic} data={data}')
+        event = MasterProductDeleteEvent(master_id=master_id)
+        cls.publish(topic=topic, event=event)
@@ -8,6 +8,7 @@ from colors.models import Color
 from colors.serializers.color_serializers import ColorIdNameSerializer
 from features.models import Feature
 from features.models import FeatureValue
+from products.constants import PRODUCT_SEARCH_MAX_RESULT_WINDOW
 from products.models import Product
 from products.models import ProductFeature
 from products.models import ProductFeatureValue
@@ -84,6 +85,8 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         )
 
     def get_features(self, obj):
+        if hasattr(obj, 'visible_features'):
+            return VariationProductFeatureSerializer(obj.visible_features, many=True).data
         return VariationProductFeatureSerializer(
             obj.features.filter(feature__is_visible=True).distinct('feature_id'), many=True
         ).data
@@ -188,3 +191,50 @@ class ProductInFavoriteListSerializer(serializers.ModelSerializer):
 
     def get_is_new(self, obj):
         return True if datetime.date.today() <= obj.created_at.date() + relativedelta(months=1) else False
+
+
+class ProductSearchQueryParamsSerializer(serializers.Serializer):
+    search = serializers.CharField(required=False, allow_blank=True)
+    brand_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    category_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    is_visible = serializers.BooleanField(required=False, default=True)
+    ordering = serializers.ChoiceField(
+        choices=[
+            'price',
+            '-price',
+            'rating',
+            '-rating',
+            'offers_count',
+            '-offers_count',
+            'created_at',
+            '-created_at',
+        ],
+        required=False,
+    )
+    details = serializers.BooleanField(required=False, default=False)
+    page = serializers.IntegerField(required=False, default=1, min_value=1)
+    page_size = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+    def validate(self, attrs):
+        if attrs['page'] * attrs['page_size'] > PRODUCT_SEARCH_MAX_RESULT_WINDOW:
+            raise serializers.ValidationError({'page': 'Page is out of the searchable range'})
+        return attrs
+
+
+class ProductSearchHitSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    master_id = serializers.IntegerField()
+    slug = serializers.CharField()
+    common_name = serializers.CharField(allow_null=True)
+    variant_name = serializers.CharField(allow_null=True)
+    main_photo = serializers.JSONField(allow_null=True)
+    brand = serializers.JSONField(allow_null=True)
+    category = serializers.JSONField(allow_null=True)
+    color_id = serializers.IntegerField(allow_null=True)
+    is_visible = serializers.BooleanField()
+    rating = serializers.FloatField(allow_null=True)
+    reviews_count = serializers.IntegerField(allow_null=True)
+    offers_count = serializers.IntegerField(allow_null=True)
+    offers_min_price = serializers.DecimalField(max_digits=20, decimal_places=4, allow_null=True)
+    offers_old_price = serializers.DecimalField(max_digits=20, decimal_places=4, allow_null=True)
+    created_at = serializers.DateTimeField()
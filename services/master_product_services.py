@@ -7,6 +7,7 @@ from django.db.models import Exists
 from django.db.models import OuterRef
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
+from django.utils import timezone
 from pytils.translit import slugify
 
 from brands.models import Brand
@@ -21,6 +22,7 @@ from common.exceptions import IntegrityException
 from common.exceptions import ObjectNotFoundException
 from common.exceptions import ValidationException
 from features.services.feature_services import FeatureService
+from products.documents import ProductDocument
 from products.models import Product
 from products.models import ProductFeature
 from products.models import ProductFeatureValue
@@ -73,8 +75,11 @@ class MasterProductService:
     @classmethod
     def bulk_update_products_brand(cls, master_product: Product, brand: Brand):
         try:
-            variation_products = ProductService.filter(master=master_product)
-            variation_products.update(brand=brand)
+            variation_products = ProductService.filter(master=master_product).exclude(brand=brand)
+            if variation_products.update(brand=brand, updated_at=timezone.now()):
+                ProductProducer.master_product_bulk_update_products_brand(
+                    master_product=master_product, brand_id=brand.id
+                )
 
             return master_product
         except IntegrityError as e:
@@ -228,6 +233,7 @@ class MasterProductService:
             cls.update_master_product_visibility(master_product=master_product, is_visible=is_visible)
             cls.bulk_update_products_brand(master_product=master_product, brand=brand)
             master_product.save()
+            ProductDocument.reindex_master_variations(master_id=master_product.id)
 
             ActivityProducer.activity_create(
                 product=master_product,
@@ -0,0 +1,85 @@
+from django.db.models import Prefetch
+from elasticsearch_dsl import Q
+
+from products.documents import ProductDocument
+from products.models import ProductFeature
+from products.services.product_services import ProductService
+
+PRODUCT_SEARCH_ORDERING_FIELDS = {
+    'price': 'offers_min_price',
+    'rating': 'rating',
+    'offers_count': 'offers_count',
+    'created_at': 'created_at',
+}
+PRODUCT_SEARCH_SOURCE_FIELDS = [
+    'id',
+    'master_id',
+    'slug',
+    'common_name',
+    'variant_name',
+    'main_photo',
+    'brand',
+    'category',
+    'color_id',
+    'is_visible',
+    'rating',
+    'reviews_count',
+    'offers_count',
+    'offers_min_price',
+    'offers_old_price',
+    'created_at',
+]
+
+
+class ProductSearchService:
+    @classmethod
+    def build_search(
+        cls,
+        search: str = None,
+        brand_ids: list = None,
+        category_ids: list = None,
+        is_visible: bool = True,
+        ordering: str = None,
+    ):
+        query = ProductDocument.search().source(PRODUCT_SEARCH_SOURCE_FIELDS)
+        filters = [Q('exists', field='master_id'), Q('term', is_visible=is_visible)]
+        if brand_ids:
+            filters.append(Q('terms', brand__id=brand_ids))
+        if category_ids:
+            filters.append(Q('terms', category__id=category_ids))
+        if search:
+            query = query.query(
+                'bool',
+                must=[Q('multi_match', query=search, fields=['common_name^2', 'variant_name'], operator='and')],
+                filter=filters,
+            )
+        else:
+            query = query.query('bool', filter=filters)
+        if ordering:
+            field = PRODUCT_SEARCH_ORDERING_FIELDS[ordering.lstrip('-')]
+            query = query.sort({field: {'order': 'desc' if ordering.startswith('-') else 'asc'}}, 'id')
+        elif not search:
+            query = query.sort({'created_at': {'order': 'desc'}}, 'id')
+        return query
+
+    @classmethod
+    def search(cls, page: int, page_size: int, **kwargs) -> tuple:
+        offset = (page - 1) * page_size
+        response = cls.build_search(**kwargs).extra(track_total_hits=True)[offset:offset + page_size].execute()
+        return response.hits.total.value, [hit.to_dict() for hit in response.hits]
+
+    @classmethod
+    def get_products_in_order(cls, ids: list) -> list:
+        visible_features = (
+            ProductFeature.objects.filter(feature__is_visible=True)
+            .select_related('feature')
+            .order_by('product_id', 'feature_id')
+            .distinct('product_id', 'feature_id')
+        )
+        products = (
+            ProductService.filter(id__in=ids)
+            .select_related('color')
+            .prefetch_related(Prefetch('features', queryset=visible_features, to_attr='visible_features'))
+            .in_bulk()
+        )
+        return [products[product_id] for product_id in ids if product_id in products]
@@ -8,6 +8,7 @@ from django.db.models import Q
 from django.db.models import QuerySet
 from django.db.models import Value
 from django.db.models.functions import Replace
+from django.utils import timezone
 from pytils.translit import slugify
 
 from colors.models import Color
@@ -21,6 +22,8 @@ from common.exceptions import FailedDependencyException
 from common.exceptions import IntegrityException
 from common.exceptions import ObjectNotFoundException
 from common.exceptions import ValidationException
+from products.documents import ProductDocument
+from products.events import ProductSnapshotEvent
 from products.models import Product
 from products.models import ProductFeature
 from products.models import ProductFeatureValue
@@ -86,10 +89,11 @@ class ProductService:
                 )
             visible_variants = cls.filter(master=master_product, is_visible=True)
             visible_variant_ids = list(visible_variants.values_list('id', flat=True))
-            visible_variants.update(is_visible=False)
-            updated_visible_variants = cls.filter(id__in=visible_variant_ids)
-            for variant_product in updated_visible_variants:
-                ProductProducer.product_update(product=variant_product)
+            visible_variants.update(is_visible=False, updated_at=timezone.now())
+            ProductProducer.bulk_product_update(
+                products=cls.filter(id__in=visible_variant_ids), changed_fields=['is_visible']
+            )
+            ProductDocument.reindex_master_variations(master_id=master_product.id)
         except IntegrityError as e:
             raise IntegrityException(f'Невозможно оптом изменить видимость продуктов: {str(e)}')
 
@@ -178,6 +182,7 @@ class ProductService:
         miniature_photo_id: Optional[str] = None,
     ) -> Product:
         try:
+            previous_state = ProductSnapshotEvent.from_product(product=product)
             feature_values_list = [value['value_id'].value for value in features]
 
             new_generated_slug = cls.slug_generator(product.master.common_name, color.name, feature_values_list)
@@ -210,7 +215,7 @@ class ProductService:
                 product_feature, _ = ProductFeature.objects.get_or_create(product=product, feature=feature)
                 ProductFeatureValue.objects.create(product_feature=product_feature, feature_value=value)
 
-            ProductProducer.product_update(product=product)
+            ProductProducer.product_update(product=product, previous_state=previous_state)
             ActivityProducer.activity_create(
                 product=product,
                 object_model=PRODUCT_MODEL,
@@ -257,6 +262,7 @@ class ProductService:
 
         try:
             cls.validate_variation(variation_product=variation_product)
+            previous_state = ProductSnapshotEvent.from_product(product=variation_product)
             if not is_visible and variation_product.is_visible:
                 cls.validate_variation_product_turning_off_visibility(variation_product=variation_product)
 
@@ -268,7 +274,7 @@ class ProductService:
             variation_product.save()
             variation_product.refresh_from_db()
 
-            ProductProducer.product_update(product=variation_product)
+            ProductProducer.product_update(product=variation_product, previous_state=previous_state)
 
             return variation_product
         except IntegrityError as e:
@@ -283,7 +289,9 @@ class ProductService:
     def bulk_update_products_slug_and_common_name(cls, master: Product, slug: str, common_name: str) -> int:
         try:
             updated = cls.filter(master=master.id).update(
-                slug=Replace('slug', Value(master.slug), Value(slug)), common_name=common_name
+                slug=Replace('slug', Value(master.slug), Value(slug)),
+                common_name=common_name,
+                updated_at=timezone.now(),
             )
             ProductProducer.master_product_bulk_update_products_slug_and_common_name(
                 master_product=master, slug=slug, common_name=common_name
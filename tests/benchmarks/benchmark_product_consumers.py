@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings.base')
+django.setup()
+
+from django.db.backends.signals import connection_created
+from django.test.utils import setup_databases
+from django.test.utils import teardown_databases
+from django.utils import timezone
+
+from brands.tests.factories import BrandFactory
+from categories.tests.factories import CategoryFactory
+from colors.tests.factories import ColorFactory
+from products.consumers.schemas import OfferCountPriceSchema
+from products.consumers.schemas import ProductReviewCountRatingSchema
+from products.consumers.services import close_database_connections
+from products.consumers.services import persist_offer_count
+from products.consumers.services import persist_offer_count_batch
+from products.consumers.services import persist_product_review_count_rating_update_topic
+from products.tests.factories import ProductFactory
+
+_query_count_lock = threading.Lock()
+_query_count = 0
+
+
+def _count_queries(execute, sql, params, many, context):
+    global _query_count
+    with _query_count_lock:
+        _query_count += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    # fires again on every reconnect of the same per-thread connection
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+def create_products(count: int) -> list:
+    brand = BrandFactory()
+    category = CategoryFactory()
+    color = ColorFactory()
+    master = ProductFactory(brand=brand, category=category, color=color, variation_features=[])
+    products = ProductFactory.create_batch(
+        count, master=master, brand=brand, category=category, color=color, variation_features=[]
+    )
+    return [product.id for product in products]
+
+
+def generate_messages(
+    product_ids: list,
+    topic: str,
+    messages: int,
+    duplicate_ratio: float,
+    key_skew: float,
+    missing_ratio: float,
+    seed: int,
+) -> list:
+    generator = random.Random(seed)
+    weights = [1 / (rank + 1) ** key_skew for rank in range(len(product_ids))]
+    missing_id = max(product_ids) + 1
+    last_messages = {}
+    result = []
+    for product_id in generator.choices(product_ids, weights=weights, k=messages):
+        if generator.random() < missing_ratio:
+            product_id = missing_id
+            missing_id += 1
+        if product_id in last_messages and generator.random() < duplicate_ratio:
+            result.append(last_messages[product_id])
+            continue
+        if topic == 'offers':
+            message = OfferCountPriceSchema(
+                product_id=product_id,
+                count=generator.randint(0, 50),
+                price=Decimal(generator.randint(100, 100000)),
+                old_price=None,
+            )
+        else:
+            message = ProductReviewCountRatingSchema(
+                product_id=product_id,
+                reviews_count=generator.randint(0, 500),
+                rating=round(generator.uniform(1, 5), 1),
+            )
+        last_messages[product_id] = message
+        result.append(message)
+    return result
+
+
+async def run(messages: list, topic: str, batch_size: int) -> dict:
+    global _query_count
+    _query_count = 0
+    channel = asyncio.Queue()
+    for message in messages:
+        channel.put_nowait(message)
+
+    latencies = []
+    started_at = time.perf_counter()
+    while not channel.empty():
+        message_started_at = time.perf_counter()
+        if topic == 'offers' and batch_size:
+            batch = [channel.get_nowait() for _ in range(min(batch_size, channel.qsize()))]
+            await persist_offer_count_batch(batch)
+            latencies.extend([time.perf_counter() - message_started_at] * len(batch))
+            continue
+
+        message = channel.get_nowait()
+        if topic == 'offers':
+            await persist_offer_count(message)
+        else:
+            await persist_product_review_count_rating_update_topic(message)
+        latencies.append(time.perf_counter() - message_started_at)
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return dict(
+        elapsed_seconds=round(elapsed, 3),
+        messages_per_second=round(len(messages) / elapsed, 1),
+        latency_p50_ms=round(statistics.median(latencies) * 1000, 3),
+        latency_p99_ms=round(latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, 3),
+        queries_per_message=round(_query_count / len(messages), 3),
+    )
+
+
+def write_result(result: dict, output: str):
+    line = json.dumps(result)
+    with open(output, 'a') as output_file:
+        output_file.write(line + '\n')
+    sys.stdout.write(line + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the product consumers against a throwaway test database')
+    parser.add_argument('--topic', choices=['offers', 'reviews'], default='offers')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.5)
+    parser.add_argument('--key-skew', type=float, default=1.0)
+    parser.add_argument('--missing-ratio', type=float, default=0.01)
+    parser.add_argument('--batch-size', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--with-elasticsearch', action='store_true')
+    parser.add_argument('--output', default='consumer_benchmarks.jsonl')
+    args = parser.parse_args()
+
+    old_config = setup_databases(verbosity=0, interactive=False)
+    connection_created.connect(_install_query_counter)
+    try:
+        product_ids = create_products(count=args.products)
+        messages = generate_messages(
+            product_ids=product_ids,
+            topic=args.topic,
+            messages=args.messages,
+            duplicate_ratio=args.duplicate_ratio,
+            key_skew=args.key_skew,
+            missing_ratio=args.missing_ratio,
+            seed=args.seed,
+        )
+        if args.with_elasticsearch:
+            result = asyncio.run(run(messages=messages, topic=args.topic, batch_size=args.batch_size))
+        else:
+            with mock.patch('products.documents.ProductDocument.bulk_update_counters'):
+                result = asyncio.run(run(messages=messages, topic=args.topic, batch_size=args.batch_size))
+    finally:
+        connection_created.disconnect(_install_query_counter)
+        close_database_connections()
+        teardown_databases(old_config, verbosity=0)
+
+    result.update(
+        created_at=timezone.now().isoformat(),
+        topic=args.topic,
+        messages=args.messages,
+        products=args.products,
+        duplicate_ratio=args.duplicate_ratio,
+        key_skew=args.key_skew,
+        missing_ratio=args.missing_ratio,
+        batch_size=args.batch_size,
+    )
+    write_result(result=result, output=args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from common.constants import OFFER_PRICE_COUNT_UPDATE_TOPIC
+from common.constants import PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC
+from products import metrics
+from products.constants import CONSUMER_MESSAGES_SKIPPED_METRIC
+from products.constants import CONSUMER_MISSING_PRODUCTS_METRIC
+from products.consumers.schemas import OfferCountPriceSchema
+from products.consumers.schemas import ProductReviewCountRatingSchema
+from products.consumers.services import persist_offer_count
+from products.consumers.services import persist_offer_count_batch
+from products.consumers.services import persist_product_review_count_rating_update_topic
+from products.models import Product
+from products.tests.factories import ProductFactory
+
+# the wrapped functions run on the consumer DB pool with their own connections, which can not
+# see the test transaction, so the tests call the synchronous functions directly
+persist_offer_count = persist_offer_count.__wrapped__
+persist_offer_count_batch = persist_offer_count_batch.__wrapped__
+persist_product_review_count_rating_update_topic = persist_product_review_count_rating_update_topic.__wrapped__
+
+
+@mock.patch('products.consumers.services.ProductDocument.bulk_update_counters')
+class PersistOfferCountTest(TestCase):
+    def setUp(self) -> None:
+        self.master_product = ProductFactory()
+        self.product = ProductFactory(
+            master=self.master_product,
+            offers_count=2,
+            offers_min_price=Decimal('99.9900'),
+            offers_old_price=Decimal('120.0000'),
+        )
+        self.updated_at = Product.objects.get(id=self.product.id).updated_at
+
+    def test_changed_offer_is_written(self, mock_bulk_update_counters):
+        persist_offer_count(OfferCountPriceSchema(product_id=self.product.id, count=3, price=89.5, old_price=None))
+
+        product = Product.objects.get(id=self.product.id)
+        self.assertEqual(product.offers_count, 3)
+        self.assertEqual(product.offers_min_price, Decimal('89.5'))
+        self.assertIsNone(product.offers_old_price)
+        self.assertEqual(product.updated_at, self.updated_at)
+        mock_bulk_update_counters.assert_called_once_with(
+            {self.product.id: dict(offers_count=3, offers_min_price=Decimal('89.5'), offers_old_price=None)}
+        )
+
+    def test_unchanged_offer_is_skipped(self, mock_bulk_update_counters):
+        skipped = metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+
+        persist_offer_count(OfferCountPriceSchema(product_id=self.product.id, count=2, price=99.99, old_price=120))
+
+        mock_bulk_update_counters.assert_not_called()
+        self.assertEqual(
+            metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC), skipped + 1
+        )
+
+    def test_offer_with_price_beyond_stored_precision_is_skipped(self, mock_bulk_update_counters):
+        persist_offer_count(
+            OfferCountPriceSchema(product_id=self.product.id, count=2, price=99.99001, old_price=119.99996)
+        )
+
+        mock_bulk_update_counters.assert_not_called()
+
+    def test_missing_product_is_counted(self, mock_bulk_update_counters):
+        missing = metrics.get_counter(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+
+        persist_offer_count(OfferCountPriceSchema(product_id=self.product.id + 100, count=1, price=1, old_price=1))
+
+        mock_bulk_update_counters.assert_not_called()
+        self.assertEqual(
+            metrics.get_counter(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC), missing + 1
+        )
+
+    def test_batch_writes_latest_changed_offers(self, mock_bulk_update_counters):
+        unchanged_product = ProductFactory(
+            master=self.master_product, offers_count=1, offers_min_price=Decimal('10.0000'), offers_old_price=None
+        )
+        skipped = metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+        missing = metrics.get_counter(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC)
+
+        persist_offer_count_batch(
+            [
+                OfferCountPriceSchema(product_id=self.product.id, count=5, price=50, old_price=None),
+                OfferCountPriceSchema(product_id=unchanged_product.id, count=1, price=10, old_price=None),
+                OfferCountPriceSchema(product_id=self.product.id, count=4, price=40, old_price=None),
+                OfferCountPriceSchema(product_id=self.product.id + 100, count=1, price=1, old_price=None),
+            ]
+        )
+
+        product = Product.objects.get(id=self.product.id)
+        self.assertEqual(product.offers_count, 4)
+        self.assertEqual(product.offers_min_price, Decimal('40'))
+        self.assertEqual(product.updated_at, self.updated_at)
+        mock_bulk_update_counters.assert_called_once_with(
+            {self.product.id: dict(offers_count=4, offers_min_price=Decimal('40'), offers_old_price=None)}
+        )
+        self.assertEqual(
+            metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC), skipped + 2
+        )
+        self.assertEqual(
+            metrics.get_counter(CONSUMER_MISSING_PRODUCTS_METRIC, topic=OFFER_PRICE_COUNT_UPDATE_TOPIC), missing + 1
+        )
+
+
+@mock.patch('products.consumers.services.ProductDocument.bulk_update_counters')
+class PersistProductReviewCountRatingTest(TestCase):
+    def setUp(self) -> None:
+        self.master_product = ProductFactory()
+        self.product = ProductFactory(master=self.master_product, reviews_count=2, rating=4.5)
+
+    def test_changed_rating_is_written(self, mock_bulk_update_counters):
+        persist_product_review_count_rating_update_topic(
+            ProductReviewCountRatingSchema(product_id=self.product.id, reviews_count=3, rating=4.0)
+        )
+
+        product = Product.objects.get(id=self.product.id)
+        self.assertEqual(product.reviews_count, 3)
+        self.assertEqual(product.rating, 4.0)
+        mock_bulk_update_counters.assert_called_once_with({self.product.id: dict(reviews_count=3, rating=4.0)})
+
+    def test_unchanged_rating_is_skipped(self, mock_bulk_update_counters):
+        skipped = metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC)
+
+        persist_product_review_count_rating_update_topic(
+            ProductReviewCountRatingSchema(product_id=self.product.id, reviews_count=2, rating=4.5)
+        )
+
+        mock_bulk_update_counters.assert_not_called()
+        self.assertEqual(
+            metrics.get_counter(CONSUMER_MESSAGES_SKIPPED_METRIC, topic=PRODUCT_REVIEW_COUNT_RATING_UPDATE_TOPIC),
+            skipped + 1,
+        )
@@ -0,0 +1,82 @@
+import json
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from products.models import Product
+from products.tests.factories import ProductFactory
+
+
+@mock.patch('products.management.commands.apply_product_snapshot.product_index_queue')
+@mock.patch('products.management.commands.apply_product_snapshot.ProductDocument')
+class ApplyProductSnapshotCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.product = ProductFactory(offers_count=0)
+
+    def write_snapshot(self, lines: list, suffix: str = '.ndjson') -> str:
+        snapshot = tempfile.NamedTemporaryFile(mode='w', suffix=suffix)
+        self.addCleanup(snapshot.close)
+        snapshot.write('\n'.join(lines) + '\n')
+        snapshot.flush()
+        return snapshot.name
+
+    def test_applies_ndjson_snapshot(self, mock_document, mock_queue):
+        path = self.write_snapshot([json.dumps({'product_id': self.product.id, 'count': 3, 'price': '10.5'})])
+
+        call_command('apply_product_snapshot', path)
+
+        product = Product.objects.get(id=self.product.id)
+        self.assertEqual(product.offers_count, 3)
+        self.assertEqual(product.offers_min_price, Decimal('10.5'))
+        self.assertIsNone(product.offers_old_price)
+        mock_document.bulk_update_counters.assert_called_once()
+        mock_queue.flush.assert_called_once()
+
+    def test_applies_csv_snapshot(self, mock_document, mock_queue):
+        path = self.write_snapshot(['product_id,count,price,old_price', f'{self.product.id},2,5,'], suffix='.csv')
+
+        call_command('apply_product_snapshot', path)
+
+        self.assertEqual(Product.objects.get(id=self.product.id).offers_count, 2)
+
+    def test_rejects_line_that_is_not_an_object(self, mock_document, mock_queue):
+        path = self.write_snapshot([json.dumps({'product_id': self.product.id, 'count': 3}), '[1, 2]'])
+
+        with self.assertRaisesMessage(CommandError, 'Line 2: expected an object'):
+            call_command('apply_product_snapshot', path)
+
+        self.assertEqual(Product.objects.get(id=self.product.id).offers_count, 0)
+
+    def test_rejects_missing_required_values(self, mock_document, mock_queue):
+        for record, name in (({'count': 3}, 'product_id'), ({'product_id': self.product.id, 'price': 1}, 'count')):
+            with self.subTest(name=name):
+                path = self.write_snapshot([json.dumps(record)])
+
+                with self.assertRaisesMessage(CommandError, f'Line 1: {name} is required'):
+                    call_command('apply_product_snapshot', path)
+
+    def test_rejects_non_numeric_values(self, mock_document, mock_queue):
+        for record, name in (
+            ({'product_id': 'abc', 'count': 3}, 'product_id'),
+            ({'product_id': self.product.id, 'count': 1.5}, 'count'),
+            ({'product_id': self.product.id, 'count': 3, 'price': 'free'}, 'price'),
+        ):
+            with self.subTest(name=name):
+                path = self.write_snapshot([json.dumps(record)])
+
+                with self.assertRaisesMessage(CommandError, f'Line 1: {name} must be a number'):
+                    call_command('apply_product_snapshot', path)
+
+        self.assertEqual(Product.objects.get(id=self.product.id).offers_count, 0)
+
+    def test_wraps_database_errors(self, mock_document, mock_queue):
+        path = self.write_snapshot([json.dumps({'product_id': self.product.id, 'count': -1})])
+
+        with self.assertRaisesMessage(CommandError, 'Can not apply snapshot'):
+            call_command('apply_product_snapshot', path)
+
+        self.assertEqual(Product.objects.get(id=self.product.id).offers_count, 0)
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from products.services.product_search_services import ProductSearchService
+
+
+class ProductSearchServiceBuildSearchTest(SimpleTestCase):
+    def test_build_search_without_params(self):
+        query = ProductSearchService.build_search().to_dict()
+
+        self.assertEqual(
+            query['query'],
+            {'bool': {'filter': [{'exists': {'field': 'master_id'}}, {'term': {'is_visible': True}}]}},
+        )
+        self.assertEqual(query['sort'], [{'created_at': {'order': 'desc'}}, 'id'])
+
+    def test_build_search_with_filters_and_ordering(self):
+        query = ProductSearchService.build_search(
+            brand_ids=[1, 2], category_ids=[3], is_visible=False, ordering='-price'
+        ).to_dict()
+
+        self.assertEqual(
+            query['query'],
+            {
+                'bool': {
+                    'filter': [
+                        {'exists': {'field': 'master_id'}},
+                        {'term': {'is_visible': False}},
+                        {'terms': {'brand.id': [1, 2]}},
+                        {'terms': {'category.id': [3]}},
+                    ]
+                }
+            },
+        )
+        self.assertEqual(query['sort'], [{'offers_min_price': {'order': 'desc'}}, 'id'])
+
+    def test_build_search_orders_ascending(self):
+        for ordering, field in (
+            ('price', 'offers_min_price'),
+            ('rating', 'rating'),
+            ('offers_count', 'offers_count'),
+            ('created_at', 'created_at'),
+        ):
+            with self.subTest(ordering=ordering):
+                query = ProductSearchService.build_search(ordering=ordering).to_dict()
+                self.assertEqual(query['sort'], [{field: {'order': 'asc'}}, 'id'])
+
+    def test_build_search_with_text_sorts_by_relevance(self):
+        query = ProductSearchService.build_search(search='iphone 14').to_dict()
+
+        self.assertEqual(
+            query['query']['bool']['must'],
+            [
+                {
+                    'multi_match': {
+                        'query': 'iphone 14',
+                        'fields': ['common_name^2', 'variant_name'],
+                        'operator': 'and',
+                    }
+                }
+            ],
+        )
+        self.assertNotIn('sort', query)
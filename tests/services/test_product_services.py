@@ -0,0 +1,28 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from products.models import Product
+from products.services.product_services import ProductService
+from products.tests.factories import ProductFactory
+
+
+@mock.patch('products.indexing.product_index_queue')
+@mock.patch('products.documents.product_index_queue')
+class ProductServiceBulkTurnOffVisibilityTest(TestCase):
+    def setUp(self) -> None:
+        self.master_product = ProductFactory()
+        self.variation_product = ProductFactory(master=self.master_product, offers_count=0)
+        self.variation_product_2 = ProductFactory(master=self.master_product, offers_count=0)
+        self.other_product = ProductFactory(master=ProductFactory(), offers_count=0)
+
+    def test_variations_are_queued_for_reindex_after_commit(self, mock_queue, mock_signal_queue):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductService.bulk_turn_off_visibility_of_product(master_product=self.master_product)
+            mock_queue.enqueue.assert_not_called()
+
+        self.assertFalse(Product.objects.get(id=self.variation_product.id).is_visible)
+        mock_queue.enqueue.assert_called_once()
+        self.assertCountEqual(
+            list(mock_queue.enqueue.call_args.args[0]), [self.variation_product.id, self.variation_product_2.id]
+        )
@@ -0,0 +1,32 @@
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+
+from colors.models import ColorGroup
+from features.tests.factories import FeatureFactory
+from products.dimensions import dimension_cache
+
+
+class DimensionCacheTest(TestCase):
+    def setUp(self) -> None:
+        dimension_cache.invalidate()
+        self.addCleanup(dimension_cache.invalidate)
+
+    def test_get_feature_reloads_on_miss(self):
+        dimension_cache.get_feature(0)
+        feature = FeatureFactory()
+
+        self.assertEqual(dimension_cache.get_feature(feature.id)['name'], feature.name)
+
+    def test_get_feature_returns_none_for_missing_feature(self):
+        self.assertIsNone(dimension_cache.get_feature(0))
+
+    def test_feature_save_invalidates_cache(self):
+        feature = FeatureFactory()
+        dimension_cache.get_feature(feature.id)
+        feature.name = 'Renamed feature'
+        feature.save()
+
+        self.assertEqual(dimension_cache.get_feature(feature.id)['name'], 'Renamed feature')
+
+    def test_color_group_colors_change_invalidates_cache(self):
+        self.assertTrue(m2m_changed.has_listeners(ColorGroup.colors.through))
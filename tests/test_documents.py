@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from products.documents import ProductDocument
+from products.indexing import ProductIndexQueue
+
+
+@mock.patch('products.documents.product_index_queue')
+@mock.patch('products.documents.bulk')
+class ProductDocumentBulkUpdateCountersTest(SimpleTestCase):
+    def test_updated_counters_are_not_requeued(self, mock_bulk, mock_queue):
+        mock_bulk.return_value = (2, [])
+
+        ProductDocument.bulk_update_counters({1: {'offers_count': 1}, 2: {'offers_count': 2}})
+
+        mock_queue.enqueue.assert_not_called()
+
+    def test_failed_items_are_queued_for_reindex(self, mock_bulk, mock_queue):
+        mock_bulk.return_value = (1, [{'update': {'_id': '2', 'status': 404, 'error': 'document_missing_exception'}}])
+
+        ProductDocument.bulk_update_counters({1: {'offers_count': 1}, 2: {'offers_count': 2}})
+
+        mock_queue.enqueue.assert_called_once_with([2])
+
+    def test_failed_bulk_request_queues_every_product(self, mock_bulk, mock_queue):
+        mock_bulk.side_effect = ConnectionError('Elasticsearch is unavailable')
+
+        ProductDocument.bulk_update_counters({1: {'offers_count': 1}, 2: {'offers_count': 2}})
+
+        self.assertEqual(list(mock_queue.enqueue.call_args.args[0]), [1, 2])
+
+
+class ProductIndexQueueTest(SimpleTestCase):
+    @mock.patch('products.documents.ProductDocument.get_queryset')
+    @mock.patch('products.documents.ProductDocument.update')
+    def test_failed_chunk_is_retried(self, mock_update, mock_get_queryset):
+        mock_update.side_effect = [ConnectionError('Elasticsearch is unavailable'), None]
+        queue = ProductIndexQueue(window_ms=0, chunk_size=10)
+
+        with mock.patch.object(queue, '_pending'), mock.patch('products.indexing.threading.Thread'):
+            queue.enqueue([1, 2])
+            queue.flush()
+            self.assertEqual(queue._product_ids, {1, 2})
+            queue.flush()
+
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(queue._product_ids, set())
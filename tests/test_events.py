@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from products.events import COMPACT_ENCODING
+from products.events import ProductSnapshotEvent
+from products.events import ProductUpdateEvent
+from products.events import decode_event
+from products.events import encode_event
+from products.tests.factories import ProductFactory
+
+
+class ProductUpdateEventTest(TestCase):
+    def setUp(self) -> None:
+        self.master_product = ProductFactory()
+        self.product = ProductFactory(master=self.master_product, variant_name='Initial', is_visible=True)
+
+    def test_from_product_diff_lists_changed_fields(self):
+        previous_state = ProductSnapshotEvent.from_product(product=self.product)
+        self.product.variant_name = 'Updated'
+        self.product.is_visible = False
+
+        event = ProductUpdateEvent.from_product_diff(product=self.product, previous_state=previous_state)
+
+        self.assertEqual(event.changed_fields, ['variant_name', 'is_visible'])
+        self.assertEqual(event.key, self.product.id)
+
+    def test_from_product_without_previous_state_is_full_snapshot(self):
+        event = ProductUpdateEvent.from_product_diff(product=self.product)
+
+        self.assertIsNone(event.changed_fields)
+        self.assertEqual(encode_event(event)['common_name'], self.master_product.common_name)
+
+    def test_merge_does_not_mutate_events(self):
+        previous_event = ProductUpdateEvent.from_product(product=self.product)
+        previous_event.changed_fields = ['variant_name']
+        event = ProductUpdateEvent.from_product(product=self.product)
+        event.changed_fields = ['is_visible', 'variant_name']
+
+        merged_event = event.merge(previous_event)
+
+        self.assertEqual(merged_event.changed_fields, ['variant_name', 'is_visible'])
+        self.assertEqual(event.changed_fields, ['is_visible', 'variant_name'])
+        self.assertEqual(previous_event.changed_fields, ['variant_name'])
+
+    def test_merge_with_full_snapshot_keeps_full_snapshot(self):
+        previous_event = ProductUpdateEvent.from_product(product=self.product)
+        event = ProductUpdateEvent.from_product(product=self.product)
+        event.changed_fields = ['variant_name']
+
+        self.assertIsNone(event.merge(previous_event).changed_fields)
+
+    @mock.patch('products.events.PRODUCT_UPDATE_EVENTS_CHANGED_ONLY', True)
+    def test_changed_only_payload(self):
+        previous_state = ProductSnapshotEvent.from_product(product=self.product)
+        self.product.variant_name = 'Updated'
+        event = ProductUpdateEvent.from_product_diff(product=self.product, previous_state=previous_state)
+
+        self.assertEqual(
+            encode_event(event),
+            {
+                'product_id': self.product.id,
+                'master_id': self.master_product.id,
+                'variant_name': 'Updated',
+                'changed_fields': ['variant_name'],
+            },
+        )
+
+    def test_compact_encoding_round_trip(self):
+        event = ProductUpdateEvent.from_product(product=self.product)
+
+        self.assertEqual(decode_event(encode_event(event, encoding=COMPACT_ENCODING)), encode_event(event))
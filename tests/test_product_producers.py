@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from common.constants import PRODUCT_UPDATE_TOPIC
+from products.events import ProductSnapshotEvent
+from products.events import decode_event
+from products.models import Product
+from products.models import ProductEventOutbox
+from products.product_producers import ProductProducer
+from products.tests.factories import ProductFactory
+
+
+class ProductProducerCoalescingTest(TestCase):
+    def setUp(self) -> None:
+        ProductProducer.clear_pending_events()
+        self.master_product = ProductFactory()
+        self.product = ProductFactory(master=self.master_product, variant_name='Initial', description='Initial')
+
+    def update_product(self, **values):
+        previous_state = ProductSnapshotEvent.from_product(product=self.product)
+        for field, value in values.items():
+            setattr(self.product, field, value)
+        self.product.save()
+        ProductProducer.product_update(product=self.product, previous_state=previous_state)
+
+    def get_outbox_events(self) -> list:
+        return [
+            decode_event(outbox_event.data)
+            for outbox_event in ProductEventOutbox.objects.filter(topic=PRODUCT_UPDATE_TOPIC, key=str(self.product.id))
+        ]
+
+    def test_last_state_wins(self):
+        self.update_product(variant_name='First')
+        self.update_product(variant_name='Second')
+
+        outbox_events = self.get_outbox_events()
+        self.assertEqual(len(outbox_events), 1)
+        self.assertEqual(outbox_events[0]['variant_name'], 'Second')
+
+    def test_changed_fields_are_merged(self):
+        self.update_product(variant_name='First')
+        self.update_product(description='Updated')
+
+        outbox_events = self.get_outbox_events()
+        self.assertEqual(len(outbox_events), 1)
+        self.assertEqual(outbox_events[0]['changed_fields'], ['variant_name', 'description'])
+        self.assertEqual(outbox_events[0]['variant_name'], 'First')
+        self.assertEqual(outbox_events[0]['description'], 'Updated')
+
+    def test_bulk_update_merges_into_pending_event(self):
+        self.update_product(variant_name='First')
+        self.product.is_visible = False
+        self.product.save()
+        ProductProducer.bulk_product_update(
+            products=Product.objects.filter(id=self.product.id), changed_fields=['is_visible']
+        )
+
+        outbox_events = self.get_outbox_events()
+        self.assertEqual(len(outbox_events), 1)
+        self.assertEqual(outbox_events[0]['changed_fields'], ['variant_name', 'is_visible'])
+        self.assertEqual(outbox_events[0]['is_visible'], False)
+
+    def test_rolled_back_event_falls_back_to_insert(self):
+        try:
+            with transaction.atomic():
+                self.update_product(variant_name='Rolled back')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.product.refresh_from_db()
+        self.update_product(description='Updated')
+
+        outbox_events = self.get_outbox_events()
+        self.assertEqual(len(outbox_events), 1)
+        self.assertEqual(outbox_events[0]['changed_fields'], ['description'])
+        self.assertEqual(outbox_events[0]['variant_name'], 'Initial')
+
+
+@mock.patch('products.product_producers.kafka_messenger')
+class ProductProducerRelayTest(TestCase):
+    def setUp(self) -> None:
+        self.first_event = ProductEventOutbox.objects.create(topic=PRODUCT_UPDATE_TOPIC, key='1', data={'v': 1})
+        self.other_key_event = ProductEventOutbox.objects.create(topic=PRODUCT_UPDATE_TOPIC, key='2', data={'v': 1})
+        self.second_event = ProductEventOutbox.objects.create(topic=PRODUCT_UPDATE_TOPIC, key='1', data={'v': 2})
+
+    def test_published_rows_are_deleted_in_order(self, mock_messenger):
+        published = ProductProducer.relay_outbox_events(batch_size=10)
+
+        self.assertEqual(published, 3)
+        self.assertFalse(ProductEventOutbox.objects.exists())
+        self.assertEqual(
+            mock_messenger.publish.call_args_list,
+            [
+                mock.call(topic=PRODUCT_UPDATE_TOPIC, data={'v': 1}, key='1'),
+                mock.call(topic=PRODUCT_UPDATE_TOPIC, data={'v': 1}, key='2'),
+                mock.call(topic=PRODUCT_UPDATE_TOPIC, data={'v': 2}, key='1'),
+            ],
+        )
+
+    def test_failed_key_keeps_its_later_rows(self, mock_messenger):
+        mock_messenger.publish.side_effect = [Exception('Broker is unavailable'), None]
+
+        published = ProductProducer.relay_outbox_events(batch_size=10)
+
+        self.assertEqual(published, 1)
+        self.assertEqual(mock_messenger.publish.call_count, 2)
+        self.assertEqual(mock_messenger.publish.call_args.kwargs['key'], '2')
+        self.assertEqual(
+            list(ProductEventOutbox.objects.order_by('id').values_list('id', flat=True)),
+            [self.first_event.id, self.second_event.id],
+        )
+
+    def test_failed_rows_are_retried_in_order(self, mock_messenger):
+        mock_messenger.publish.side_effect = [Exception('Broker is unavailable'), None, None, None]
+        ProductProducer.relay_outbox_events(batch_size=10)
+
+        published = ProductProducer.relay_outbox_events(batch_size=10)
+
+        self.assertEqual(published, 2)
+        self.assertFalse(ProductEventOutbox.objects.exists())
+        self.assertEqual(
+            [call.kwargs['data'] for call in mock_messenger.publish.call_args_list[2:]], [{'v': 1}, {'v': 2}]
+        )
+
+    def test_batch_size_limits_rows(self, mock_messenger):
+        published = ProductProducer.relay_outbox_events(batch_size=2)
+
+        self.assertEqual(published, 2)
+        self.assertEqual(list(ProductEventOutbox.objects.values_list('id', flat=True)), [self.second_event.id])
+
+    def test_relay_command_drains_outbox_once(self, mock_messenger):
+        call_command('relay_product_events', '--once', '--batch-size', '2')
+
+        self.assertEqual(mock_messenger.publish.call_count, 3)
+        self.assertFalse(ProductEventOutbox.objects.exists())
@@ -1,6 +1,7 @@
 from unittest import mock
 
 from authorizations.user_service import UserData
+from pytils.translit import slugify
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
@@ -10,10 +11,15 @@ from categories.tests.factories import CategoryFactory
 from colors.tests.factories import ColorFactory
 from common.constants import ACCOUNT_MANAGER_ROLE
 from common.constants import CONTENT_MANAGER_ROLE
+from common.constants import PRODUCT_SLUG_AND_COMMON_NAME_BULK_UPDATE_TOPIC
+from common.constants import PRODUCT_UPDATE_TOPIC
 from common.utils import generate_test_jwt_token
 from features.tests.factories import FeatureFactory
 from features.tests.factories import FeatureGroupFactory
 from features.tests.factories import FeatureValueFactory
+from products.constants import PRODUCT_BRAND_BULK_UPDATE_TOPIC
+from products.events import decode_event
+from products.models import ProductEventOutbox
 from products.tests.factories import ProductFactory
 from products.tests.factories import ProductFeatureFactory
 from products.tests.factories import ProductFeatureValueFactory
@@ -123,10 +129,19 @@ class ProductUpdateViewTest(APITestCase):
             'file_size': 6,
         }
         mock_get_image.return_value = mocked_image
+        new_brand = BrandFactory(categories=self.category)
+        ProductFactory(
+            master=self.master_product,
+            color=self.color,
+            offers_count=0,
+            category=self.category,
+            brand=self.brand,
+            variation_features=self.variation_features,
+        )
         body = {
             'common_name': 'Galaxy Test',
             'is_visible': False,
-            'brand': self.brand.id,
+            'brand': new_brand.id,
             'description': 'Some description test',
             'main_photo_id': '11',
             'photo_ids': ['12'],
@@ -152,6 +167,104 @@ class ProductUpdateViewTest(APITestCase):
         self.assertEqual(response.json()['video_urls'], body['video_urls'])
         self.assertEqual(response.json()['variation_features'][0]['id'], body['variation_features'][0])
         self.assertEqual(response.json()['features'][0]['id'], body['features'][0]['feature_id'])
+        outbox_event = ProductEventOutbox.objects.get(
+            topic=PRODUCT_SLUG_AND_COMMON_NAME_BULK_UPDATE_TOPIC, key=str(self.master_product.id)
+        )
+        self.assertEqual(decode_event(outbox_event.data)['common_name'], body['common_name'])
+        self.assertEqual(decode_event(outbox_event.data)['new_slug'], slugify(body['common_name']))
+        self.assertFalse(ProductEventOutbox.objects.filter(topic=PRODUCT_UPDATE_TOPIC).exists())
+        brand_events = ProductEventOutbox.objects.filter(topic=PRODUCT_BRAND_BULK_UPDATE_TOPIC)
+        self.assertEqual(brand_events.count(), 1)
+        self.assertEqual(brand_events[0].key, str(self.master_product.id))
+        self.assertEqual(decode_event(brand_events[0].data)['brand_id'], new_brand.id)
+
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    @mock.patch('common.cdn_services.CDNService.get_image_dict')
+    def test_success_update_master_product_without_brand_change(self, mock_get_image, mock_user):
+        mock_user.return_value = self.mock_content_manager
+        mock_get_image.return_value = {
+            'id': 11,
+            'url': 'http://10.120.200.243:9000/market-test/6kb_pic-16647790287173183.jpg',
+            'filename': '6kb_pic-16647790287173183.jpg',
+            'file_size': 6,
+        }
+        ProductFactory(
+            master=self.master_product,
+            color=self.color,
+            offers_count=0,
+            category=self.category,
+            brand=self.brand,
+            variation_features=self.variation_features,
+        )
+        body = {
+            'common_name': self.master_product.common_name,
+            'is_visible': True,
+            'brand': self.brand.id,
+            'description': 'Some description test',
+            'main_photo_id': '11',
+            'photo_ids': ['12'],
+            'video_urls': ['https://youtube.com/somevideo'],
+            'variation_features': [self.variation_features.id],
+            'features': [
+                {
+                    'feature_id': self.master_product_feature_value.product_feature.feature.id,
+                    'value_id': self.master_product_feature_value.feature_value.id,
+                }
+            ],
+        }
+        response = self.client.put(
+            reverse(self.url, kwargs={'slug_or_pk': self.master_product.id}), data=body, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(ProductEventOutbox.objects.filter(topic=PRODUCT_BRAND_BULK_UPDATE_TOPIC).exists())
+
+    @mock.patch('products.indexing.product_index_queue')
+    @mock.patch('products.documents.product_index_queue')
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    @mock.patch('common.cdn_services.CDNService.get_image_dict')
+    def test_success_update_master_product_queues_variations_for_reindex(
+        self, mock_get_image, mock_user, mock_queue, mock_signal_queue
+    ):
+        mock_user.return_value = self.mock_content_manager
+        mock_get_image.return_value = {
+            'id': 11,
+            'url': 'http://10.120.200.243:9000/market-test/6kb_pic-16647790287173183.jpg',
+            'filename': '6kb_pic-16647790287173183.jpg',
+            'file_size': 6,
+        }
+        variation_product = ProductFactory(
+            master=self.master_product,
+            color=self.color,
+            offers_count=0,
+            category=self.category,
+            brand=self.brand,
+            variation_features=self.variation_features,
+        )
+        body = {
+            'common_name': self.master_product.common_name,
+            'is_visible': False,
+            'brand': self.brand.id,
+            'description': 'Some description test',
+            'main_photo_id': '11',
+            'photo_ids': ['12'],
+            'video_urls': ['https://youtube.com/somevideo'],
+            'variation_features': [self.variation_features.id],
+            'features': [
+                {
+                    'feature_id': self.master_product_feature_value.product_feature.feature.id,
+                    'value_id': self.master_product_feature_value.feature_value.id,
+                }
+            ],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse(self.url, kwargs={'slug_or_pk': self.master_product.id}), data=body, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_queue.enqueue.assert_called_once()
+        self.assertEqual(list(mock_queue.enqueue.call_args.args[0]), [variation_product.id])
 
     @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
     @mock.patch('common.cdn_services.CDNService.get_image_dict')
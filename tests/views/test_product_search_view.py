@@ -0,0 +1,182 @@
+from unittest import mock
+
+from authorizations.user_service import UserData
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from brands.tests.factories import BrandFactory
+from categories.tests.factories import CategoryFactory
+from colors.tests.factories import ColorFactory
+from common.constants import ACCOUNT_MANAGER_ROLE
+from common.constants import MERCHANT_MANAGER_ROLE
+from common.utils import generate_test_jwt_token
+from features.tests.factories import FeatureFactory
+from features.tests.factories import FeatureGroupFactory
+from products.tests.factories import ProductFactory
+from products.tests.factories import ProductFeatureFactory
+
+
+class ProductSearchViewTest(APITestCase):
+    maxDiff = None
+
+    def setUp(self) -> None:
+        self.url = reverse('v1:search_product')
+        self.category = CategoryFactory()
+        self.color = ColorFactory(name='Color test')
+        self.brand = BrandFactory(categories=self.category)
+        self.feature_group = FeatureGroupFactory(categories=self.category)
+        self.variation_features = FeatureFactory(
+            group=self.feature_group,
+            is_variation=True,
+        )
+        self.master_product = ProductFactory(
+            color=self.color, category=self.category, brand=self.brand, variation_features=self.variation_features
+        )
+        self.product = ProductFactory(
+            master=self.master_product,
+            color=self.color,
+            category=self.category,
+            brand=self.brand,
+            variation_features=self.variation_features,
+        )
+        self.product_2 = ProductFactory(
+            master=self.master_product,
+            color=self.color,
+            category=self.category,
+            brand=self.brand,
+            variation_features=self.variation_features,
+        )
+        self.hits = [
+            {
+                'id': self.product_2.id,
+                'master_id': self.master_product.id,
+                'slug': self.product_2.slug,
+                'common_name': self.master_product.common_name,
+                'variant_name': self.product_2.variant_name,
+                'main_photo': None,
+                'brand': {'id': self.brand.id, 'name': self.brand.name},
+                'category': {'id': self.category.id, 'name': self.category.name},
+                'color_id': self.color.id,
+                'is_visible': True,
+                'rating': 4.5,
+                'reviews_count': 2,
+                'offers_count': 3,
+                'offers_min_price': '100.0000',
+                'offers_old_price': '120.0000',
+                'created_at': '2022-10-10T10:00:00Z',
+            },
+            {
+                'id': self.product.id,
+                'master_id': self.master_product.id,
+                'slug': self.product.slug,
+                'common_name': self.master_product.common_name,
+                'variant_name': self.product.variant_name,
+                'main_photo': None,
+                'brand': {'id': self.brand.id, 'name': self.brand.name},
+                'category': {'id': self.category.id, 'name': self.category.name},
+                'color_id': self.color.id,
+                'is_visible': True,
+                'rating': 5,
+                'reviews_count': 1,
+                'offers_count': 1,
+                'offers_min_price': '150.0000',
+                'offers_old_price': '150.0000',
+                'created_at': '2022-10-09T10:00:00Z',
+            },
+        ]
+        self.mock_account_manager = UserData(
+            id=5,
+            roles=[ACCOUNT_MANAGER_ROLE],
+            email='account@example.com',
+            phone_number='+996555555555',
+            is_visible=True,
+            dcb_id='5555',
+        )
+        self.mock_merchant_manager = UserData(
+            id=3,
+            roles=[MERCHANT_MANAGER_ROLE],
+            email='merchant@example.com',
+            phone_number='+996333333333',
+            is_visible=True,
+            dcb_id='3333',
+        )
+        self.token = generate_test_jwt_token(
+            roles=self.mock_account_manager.roles,
+            user_id=self.mock_account_manager.id,
+            phone_number=self.mock_account_manager.phone_number,
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    @mock.patch('products.services.product_search_services.ProductSearchService.search')
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    def test_success_search_products(self, mock_user, mock_search):
+        mock_user.return_value = self.mock_account_manager
+        mock_search.return_value = (2, self.hits)
+        response = self.client.get(
+            self.url,
+            {'search': self.master_product.common_name, 'brand_ids': [f'{self.brand.id}'], 'ordering': '-rating'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'count': 2, 'results': self.hits})
+        mock_search.assert_called_once_with(
+            search=self.master_product.common_name,
+            brand_ids=[self.brand.id],
+            is_visible=True,
+            ordering='-rating',
+            page=1,
+            page_size=20,
+        )
+
+    @mock.patch('products.services.product_search_services.ProductSearchService.search')
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    def test_success_search_products_with_details(self, mock_user, mock_search):
+        mock_user.return_value = self.mock_account_manager
+        mock_search.return_value = (2, self.hits)
+        ProductFeatureFactory(product=self.product_2, feature=self.variation_features)
+        ProductFeatureFactory(
+            product=self.product_2, feature=FeatureFactory(group=self.feature_group, is_visible=False)
+        )
+        response = self.client.get(self.url, {'details': 'true'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(
+            [product['id'] for product in response.json()['results']], [self.product_2.id, self.product.id]
+        )
+        self.assertEqual(response.json()['results'][0]['slug'], self.product_2.slug)
+        self.assertEqual(
+            [feature['id'] for feature in response.json()['results'][0]['features']], [self.variation_features.id]
+        )
+        self.assertEqual(response.json()['results'][1]['features'], [])
+
+    @mock.patch('products.services.product_search_services.ProductSearchService.search')
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    def test_failure_search_products_invalid_ordering(self, mock_user, mock_search):
+        mock_user.return_value = self.mock_account_manager
+        response = self.client.get(self.url, {'ordering': 'banana'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEqual(response.json()['message'], 'Invalid query parameters')
+        mock_search.assert_not_called()
+
+    @mock.patch('products.services.product_search_services.ProductSearchService.search')
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    def test_failure_search_products_page_out_of_range(self, mock_user, mock_search):
+        mock_user.return_value = self.mock_account_manager
+        response = self.client.get(self.url, {'page': 1000, 'page_size': 100}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEqual(response.json()['message'], 'Invalid query parameters')
+        mock_search.assert_not_called()
+
+    @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
+    def test_failure_search_products_permission_denied(self, mock_user):
+        mock_user.return_value = self.mock_merchant_manager
+
+        response = self.client.get(self.url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.json()['detail'], 'You do not have permission to perform this action.')
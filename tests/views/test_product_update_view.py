@@ -11,11 +11,14 @@ from categories.tests.factories import CategoryFactory
 from colors.tests.factories import ColorFactory
 from common.constants import ACCOUNT_MANAGER_ROLE
 from common.constants import CONTENT_MANAGER_ROLE
+from common.constants import PRODUCT_UPDATE_TOPIC
 from common.utils import generate_test_jwt_token
 from features.tests.factories import FeatureFactory
 from features.tests.factories import FeatureGroupFactory
 from features.tests.factories import FeatureValueFactory
+from products.events import decode_event
 from products.models import Product
+from products.models import ProductEventOutbox
 from products.tests.factories import ProductFactory
 from products.tests.factories import ProductFeatureFactory
 from products.tests.factories import ProductFeatureValueFactory
@@ -121,6 +124,12 @@ class ProductUpdateViewTest(APITestCase):
         self.assertEqual(response.json()['main_photo'], mocked_image)
         self.assertEqual(response.json()['photos'], [mocked_image])
         self.assertEqual(response.json()['slug'], product.slug)
+        outbox_events = ProductEventOutbox.objects.filter(topic=PRODUCT_UPDATE_TOPIC, key=str(product.id))
+        self.assertEqual(outbox_events.count(), 1)
+        event = decode_event(outbox_events.get().data)
+        self.assertEqual(event['variant_name'], body['variant_name'])
+        self.assertEqual(event['is_visible'], body['is_visible'])
+        self.assertCountEqual(event['changed_fields'], ['variant_name', 'slug', 'main_photo', 'photos', 'is_visible'])
 
     @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
     @mock.patch('common.cdn_services.CDNService.get_image_dict')
@@ -193,6 +202,7 @@ class ProductUpdateViewTest(APITestCase):
         self.assertEqual(mock_get_image.called, True)
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
         self.assertEqual(response.json()['message'], 'Can not update product variation: wrong values in features list')
+        self.assertFalse(ProductEventOutbox.objects.exists())
 
     @mock.patch('authorizations.user_service.UserService.get_user_by_phone_number')
     def test_failure_update_product_slug_exist(self, mock_user):
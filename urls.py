@@ -8,6 +8,7 @@ from products.views.master_product_views import MasterProductVariationFeatureUsa
 from products.views.master_variation_unified_views import MasterVariationUpdateDestroyView
 from products.views.product_views import ProductListCreateView
 from products.views.product_views import ProductRetrieveView
+from products.views.product_views import ProductSearchView
 from products.views.product_views import ProductUpdateView
 
 urlpatterns = [
@@ -29,6 +30,7 @@ urlpatterns = [
         name='master_product_check_variation_features_usage',
     ),
     path('products/', ProductListCreateView.as_view(), name='list_create_product'),
+    path('products/search/', ProductSearchView.as_view(), name='search_product'),
     path('products/<int:pk>/', ProductUpdateView.as_view(), name='update_product'),
     path('products/<slug:slug>/', ProductRetrieveView.as_view(), name='retrieve_product'),
     path(
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 
 from common.constants import INVALID_INPUT
 from common.responses import NotAcceptableExceptionResponse
+from common.utils import get_query_params_data
 from permissions.permissions import CanGetProducts
 from permissions.permissions import IsAuthenticated
 from permissions.permissions import IsContentManager
@@ -16,7 +17,10 @@ from permissions.permissions import IsSuperAdmin
 from products.serializers.product_serializers import ProductBriefListSerializer
 from products.serializers.product_serializers import ProductCreateSerializer
 from products.serializers.product_serializers import ProductDetailSerializer
+from products.serializers.product_serializers import ProductSearchHitSerializer
+from products.serializers.product_serializers import ProductSearchQueryParamsSerializer
 from products.serializers.product_serializers import ProductUpdateSerializer
+from products.services.product_search_services import ProductSearchService
 from products.services.product_services import ProductService
 
 
@@ -72,3 +76,25 @@ class ProductUpdateView(GenericAPIView):
         product = ProductService.update(product=product, editor=request.user, **serializer.validated_data)
         data = self.get_serializer(product).data
         return Response(data=data, status=status.HTTP_200_OK)
+
+
+class ProductSearchView(GenericAPIView):
+    authentication_classes = (JWTAuthentication,)
+    permission_classes = (IsAuthenticated, CanGetProducts)
+
+    def get(self, request, *args, **kwargs):
+        query_params_data = get_query_params_data(query_params=request.query_params)
+        query_param_serializer = ProductSearchQueryParamsSerializer(data=query_params_data)
+        if not query_param_serializer.is_valid():
+            return NotAcceptableExceptionResponse(
+                data={'message': 'Invalid query parameters', 'errors': query_param_serializer.errors}
+            )
+        params = query_param_serializer.validated_data
+        details = params.pop('details')
+        count, hits = ProductSearchService.search(**params)
+        if details:
+            products = ProductSearchService.get_products_in_order(ids=[hit['id'] for hit in hits])
+            results = ProductDetailSerializer(products, many=True).data
+        else:
+            results = ProductSearchHitSerializer(hits, many=True).data
+        return Response(data={'count': count, 'results': results}, status=status.HTTP_200_OK)